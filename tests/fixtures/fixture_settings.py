@@ -0,0 +1,9 @@
+import pytest
+
+from core.testing import isolated_storage
+
+
+@pytest.fixture(autouse=True, scope='session')
+def storage():
+    with isolated_storage() as directory:
+        yield directory
@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'args', 'status', 'attempts', 'run_after')
+    list_filter = ('status', 'name')
+    readonly_fields = ('last_error', 'locked_at', 'created')
+
+
+admin.site.register(Task, TaskAdmin)
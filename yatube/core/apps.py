@@ -1,5 +1,20 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import auth
+        from .sessions import require_shared_cache
+        from .sqlite import configure_connection
+        require_shared_cache()
+        connection_created.connect(configure_connection)
+        user_model = get_user_model()
+        post_save.connect(auth.user_changed, sender=user_model)
+        post_delete.connect(auth.user_changed, sender=user_model)
+        user_logged_out.connect(auth.logged_out)
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+USER_KEY = 'auth:user:{}'
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя запроса из кеша.
+
+    Пользователи хранятся в кеше USER_CACHE_ALIAS. Кеш сбрасывается при
+    сохранении и удалении пользователя — в том числе при смене пароля, так
+    что проверка хеша сессии видит новый пароль, — и при выходе. Изменения
+    в обход save() (queryset.update) видны через USER_CACHE_TIMEOUT.
+    """
+
+    def get_user(self, user_id):
+        key = USER_KEY.format(user_id)
+        cache = caches[settings.USER_CACHE_ALIAS]
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+            return user
+        return user if self.user_can_authenticate(user) else None
+
+
+def forget_user(user_id):
+    caches[settings.USER_CACHE_ALIAS].delete(USER_KEY.format(user_id))
+
+
+def user_changed(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+def logged_out(sender, request, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
@@ -0,0 +1,80 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError
+
+logger = logging.getLogger('yatube.buffers')
+
+
+class BufferedCounter:
+    """Счётчики, которые копятся в памяти процесса и пишутся пачкой.
+
+    incr только прибавляет к словарю под блокировкой. Когда накопилось
+    size_setting приращений или с прошлой записи прошло seconds_setting
+    секунд, поток, вызвавший incr, забирает буфер и передаёт его в
+    flush(deltas). flush должна прибавлять приращения в базе, а не
+    записывать итог: тогда записи разных процессов складываются, и
+    процессы не мешают друг другу. Если запись упала, приращения
+    возвращаются в буфер.
+
+    Ребёнок после fork начинает с пустого буфера, чтобы приращения
+    родителя не записались дважды. Остаток буфера при остановке процесса
+    теряется: это не больше size_setting приращений за seconds_setting
+    секунд.
+    """
+
+    def __init__(self, flush, seconds_setting, size_setting):
+        self._flush = flush
+        self.seconds_setting = seconds_setting
+        self.size_setting = size_setting
+        self._lock = threading.Lock()
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._forked)
+
+    def _forked(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._deltas = Counter()
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+
+    def incr(self, key, delta=1):
+        with self._lock:
+            self._deltas[key] += delta
+            self._pending += delta
+            due = (
+                self._pending >= getattr(settings, self.size_setting)
+                or time.monotonic() - self._flushed_at
+                >= getattr(settings, self.seconds_setting)
+            )
+        if due:
+            self.flush()
+
+    def take(self):
+        """Забирает накопленные приращения, оставляя буфер пустым."""
+        with self._lock:
+            deltas = self._deltas
+            self._reset()
+        return deltas
+
+    def flush(self):
+        deltas = self.take()
+        if not deltas:
+            return 0
+        try:
+            self._flush(dict(deltas))
+        except DatabaseError:
+            logger.warning('Не удалось записать %s счётчиков', len(deltas),
+                           exc_info=True)
+            with self._lock:
+                self._deltas.update(deltas)
+                self._pending += sum(deltas.values())
+            return 0
+        return len(deltas)
@@ -0,0 +1,151 @@
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Max
+
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+KEYSET_PARAMS = (AFTER_VAR, BEFORE_VAR)
+
+
+class KeysetChangeList(ChangeList):
+    """Список объектов админки страницами по курсору на pk.
+
+    Ключи страницы выбираются по индексу первичного ключа после (after)
+    или до (before) крайнего pk соседней страницы, без OFFSET и без
+    полного COUNT(*), затем строки читаются по этим ключам. result_list —
+    вычисленный упорядоченный QuerySet, как того ждёт list_editable.
+    Число строк берётся из model_admin.estimated_count.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        super().__init__(request, *args, **kwargs)
+        for name in KEYSET_PARAMS:
+            self.params.pop(name, None)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        for name in KEYSET_PARAMS:
+            lookup_params.pop(name, None)
+        return lookup_params
+
+    def get_results(self, request):
+        per_page = self.list_per_page
+        after = self._cursor(request, AFTER_VAR)
+        before = self._cursor(request, BEFORE_VAR)
+        pks = self.queryset.order_by('-pk').values_list('pk', flat=True)
+        if before is not None:
+            page = list(pks.filter(pk__gt=before).reverse()[:per_page + 1])
+            has_previous, has_next = len(page) > per_page, True
+            page = page[:per_page]
+        else:
+            if after is not None:
+                pks = pks.filter(pk__lt=after)
+            page = list(pks[:per_page + 1])
+            has_previous, has_next = after is not None, len(page) > per_page
+            page = page[:per_page]
+        rows = self.queryset.filter(pk__in=page).order_by('-pk')
+        list(rows)
+        filtered = bool(self.query or self.get_filters_params())
+        self.result_count, self.count_is_estimate = (
+            self.model_admin.estimated_count(request, self.queryset, filtered)
+        )
+        self.full_result_count = self.result_count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.result_list = rows
+        self.can_show_all = False
+        self.multi_page = has_previous or has_next
+        self.paginator = None
+        self.previous_url = self.next_url = None
+        if page and has_previous:
+            self.previous_url = self.get_query_string(
+                {BEFORE_VAR: page[0]}, [AFTER_VAR]
+            )
+        if page and has_next:
+            self.next_url = self.get_query_string(
+                {AFTER_VAR: page[-1]}, [BEFORE_VAR]
+            )
+
+    def _cursor(self, request, name):
+        try:
+            return int(request.GET[name])
+        except (KeyError, ValueError):
+            return None
+
+
+class JoinedAutocompleteSelect(AutocompleteSelect):
+    """AutocompleteSelect, подпись которого берётся из строки списка.
+
+    Форма строки кладёт в selected связанный объект, уже прочитанный
+    через list_select_related, и вариант выводится без запроса на строку.
+    """
+
+    selected = None
+
+    def optgroups(self, name, value, attr=None):
+        selected = self.selected
+        if selected is None or [str(selected.pk)] != [str(v) for v in value]:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, selected.pk,
+            self.choices.field.label_from_instance(selected),
+            True, len(options),
+        ))
+        return [(None, options, 0)]
+
+
+class LargeTableAdmin:
+    """Режим ModelAdmin для таблиц на миллионы строк.
+
+    Страницы по курсору вместо OFFSET, без сортировки по колонкам и
+    без полного COUNT(*). Внешние ключи в list_editable выводятся через
+    autocomplete_fields: строка показывает только выбранный вариант,
+    прочитанный вместе с ней.
+    """
+
+    change_list_template = 'admin/keyset_change_list.html'
+    sortable_by = ()
+    show_full_result_count = False
+    count_limit = 1000
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.get_autocomplete_fields(request):
+            kwargs.setdefault('widget', JoinedAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using'),
+            ))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        form = super().get_changelist_form(request, **kwargs)
+
+        class ChangelistForm(form):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                opts = self.instance._meta
+                for name, field in self.fields.items():
+                    widget = getattr(field.widget, 'widget', field.widget)
+                    if (isinstance(widget, JoinedAutocompleteSelect)
+                            and opts.get_field(name).is_cached(self.instance)):
+                        widget.selected = getattr(self.instance, name)
+
+        return ChangelistForm
+
+    def estimated_count(self, request, queryset, filtered):
+        """Число строк и признак того, что это оценка.
+
+        Без фильтров — наибольший pk таблицы: один шаг по индексу. С
+        фильтрами строки считаются, но не дальше count_limit.
+        """
+        if filtered:
+            count = queryset.order_by()[:self.count_limit].count()
+            return count, count >= self.count_limit
+        return queryset.model._default_manager.aggregate(
+            count=Max('pk')
+        )['count'] or 0, True
@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.tasks import claim, execute
+
+
+def run(task):
+    try:
+        return execute(task)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди Task пулом потоков'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Размер пула потоков; 0 — выполнять в основном потоке.'
+        )
+        parser.add_argument('--batch', type=int, default=20)
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать готовые задачи и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        pool = None
+        if options['workers'] > 0:
+            pool = ThreadPoolExecutor(
+                options['workers'], thread_name_prefix='tasks'
+            )
+        done = failed = 0
+        try:
+            while True:
+                tasks = claim(options['batch'])
+                if not tasks:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+                if pool is None:
+                    results = [execute(task) for task in tasks]
+                else:
+                    results = list(pool.map(run, tasks))
+                done += results.count(True)
+                failed += results.count(False)
+                self.stdout.write(
+                    f'Выполнено: {done}, с ошибкой: {failed}'
+                )
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: выполнено {done}, с ошибкой {failed}'
+        ))
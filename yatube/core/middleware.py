@@ -0,0 +1,81 @@
+import json
+import logging
+import time
+
+from django.conf import settings
+
+from .routers import replica_reads
+from .timing import collect_metrics
+
+logger = logging.getLogger('yatube.timing')
+
+
+class ServerTimingMiddleware:
+    """Замеряет запрос: SQL, рендер шаблонов, view и общее время.
+
+    Ставится первым в MIDDLEWARE, чтобы total покрывал весь стек.
+    view считается от process_view до возврата ответа. Результат уходит
+    в заголовок Server-Timing (если SERVER_TIMING_HEADER) и одной
+    JSON-строкой в логгер yatube.timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with collect_metrics() as metrics:
+            request.metrics = metrics
+            response = self.get_response(request)
+        finished = time.perf_counter()
+        metrics.total_ms = (finished - started) * 1000
+        if metrics.view_started is not None:
+            metrics.view_ms = (finished - metrics.view_started) * 1000
+        if getattr(settings, 'SERVER_TIMING_HEADER', True):
+            response['Server-Timing'] = metrics.server_timing()
+        if logger.isEnabledFor(logging.INFO):
+            record = {
+                'method': request.method,
+                'path': request.path,
+                'view': getattr(
+                    request.resolver_match, 'view_name', None
+                ),
+                'status': response.status_code,
+            }
+            record.update(metrics.as_dict())
+            logger.info(json.dumps(record, ensure_ascii=False))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics.view_started = time.perf_counter()
+
+
+class ReplicaRoutingMiddleware:
+    """Отдаёт чтение безопасных запросов репликам (core.routers).
+
+    Изменяющие запросы и клиенты с cookie REPLICA_PIN_COOKIE читают
+    с основной базы. Если запрос что-то записал, cookie ставится на
+    REPLICA_PIN_SECONDS: после POST и редиректа автор видит свою запись,
+    даже пока реплика отстаёт.
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = (
+            request.method not in self.SAFE_METHODS
+            or settings.REPLICA_PIN_COOKIE in request.COOKIES
+        )
+        with replica_reads(pinned) as state:
+            response = self.get_response(request)
+        if state.wrote:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
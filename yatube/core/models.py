@@ -0,0 +1,73 @@
+from django.db import models
+
+
+class Task(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        verbose_name='Задача',
+        max_length=255
+    )
+    args = models.TextField(
+        verbose_name='Аргументы (JSON)',
+        default='[]'
+    )
+    status = models.CharField(
+        verbose_name='Состояние',
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING
+    )
+    dedupe_key = models.CharField(
+        verbose_name='Ключ дедупликации',
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text='Есть только у ожидающих задач: вторая такая же '
+                  'в очередь не попадёт'
+    )
+    attempts = models.PositiveIntegerField(
+        verbose_name='Попыток',
+        default=0
+    )
+    max_attempts = models.PositiveIntegerField(
+        verbose_name='Максимум попыток',
+        default=3
+    )
+    run_after = models.DateTimeField(
+        verbose_name='Не раньше'
+    )
+    locked_at = models.DateTimeField(
+        verbose_name='Взята в работу',
+        null=True,
+        blank=True
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True
+    )
+    created = models.DateTimeField(
+        verbose_name='Создана',
+        auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='task_queue_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name}{self.args} [{self.status}]'
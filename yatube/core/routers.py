@@ -0,0 +1,74 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Приложения, чтение которых можно отдавать репликам. Сессии, очередь
+# задач и служебные таблицы всегда читаются с основной базы.
+REPLICATED_APPS = frozenset(('posts', 'auth'))
+
+_state = threading.local()
+
+
+def replicas():
+    return settings.DATABASE_REPLICAS
+
+
+@contextmanager
+def replica_reads(pinned=False):
+    """Разрешает чтение с реплик на время обработки запроса.
+
+    Вне этого блока (команды, фоновые задачи, shell) всё идёт на основную
+    базу. pinned сразу закрепляет запрос за основной базой; первая запись
+    закрепляет его до конца сама.
+    """
+    _state.active = True
+    _state.pinned = pinned
+    _state.wrote = False
+    try:
+        yield _state
+    finally:
+        _state.active = False
+
+
+def pinned_to_primary():
+    return getattr(_state, 'pinned', False)
+
+
+class PrimaryReplicaRouter:
+    """Пишет в default, читает только для чтения запросы с реплик.
+
+    Реплики перечислены в DATABASE_REPLICAS; пустой список выключает
+    маршрутизацию. Объекты, уже загруженные из какой-то базы, дочитывают
+    связи оттуда же, чтобы не смешивать снимки разной свежести.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if (
+            not replicas()
+            or not getattr(_state, 'active', False)
+            or _state.pinned
+            or model._meta.app_label not in REPLICATED_APPS
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas())
+
+    def db_for_write(self, model, **hints):
+        if (
+            getattr(_state, 'active', False)
+            and model._meta.app_label in REPLICATED_APPS
+        ):
+            _state.pinned = _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Все базы в DATABASES — копии одних и тех же данных.
+        databases = settings.DATABASES
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
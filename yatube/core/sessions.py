@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.base import UpdateError
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+from .tasks import task
+
+PENDING_PREFIX = 'sessions:pending:'
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+class SessionStore(cached_db.SessionStore):
+    """Сессии cached_db: чтение из кеша, запись в БД пачками.
+
+    Сессия читается из кеша и идёт в БД только при промахе. Новая сессия
+    (вход) сразу создаётся в БД: так проверяется уникальность ключа. Дальше
+    изменения пишутся в кеш, а в БД их переносит задача persist_session:
+    пока она ждёт в очереди, новые сохранения её не ставят повторно.
+    Сохранение без изменений данных ничего не пишет.
+
+    Кеш сессий должен быть общим для процессов сайта и воркера run_tasks.
+    """
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._saved = None
+
+    def load(self):
+        data = super().load()
+        self._saved = self.encode(data)
+        return data
+
+    def save(self, must_create=False):
+        if must_create or self.session_key is None:
+            super().save(must_create)
+            self._saved = self.encode(self._session)
+            return
+        encoded = self.encode(self._get_session())
+        if encoded == self._saved:
+            return
+        self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+        self._saved = encoded
+        if self._cache.add(PENDING_PREFIX + self.session_key, True,
+                           settings.TASK_LOCK_TIMEOUT):
+            persist_session.delay(self.session_key)
+
+
+@task()
+def persist_session(session_key):
+    """Переносит в БД последнее состояние сессии из кеша."""
+    store = SessionStore(session_key)
+    store._cache.delete(PENDING_PREFIX + session_key)
+    data = store._cache.get(store.cache_key)
+    if data is None:
+        # Сессию уже удалили (выход) или она истекла.
+        return
+    store._session_cache = data
+    try:
+        DBStore.save(store)
+    except UpdateError:
+        pass
+
+
+def require_shared_cache():
+    """Падает при запуске без DEBUG, если кеш сессий или пользователей
+    не общий для процессов.
+
+    С кешем в памяти процесса воркер run_tasks не видит изменений сессий
+    и не переносит их в БД, а сброс пользователя в core.auth после смены
+    пароля не доходит до других процессов сайта.
+    """
+    if settings.DEBUG:
+        return
+    for alias in {settings.SESSION_CACHE_ALIAS, settings.USER_CACHE_ALIAS}:
+        if isinstance(caches[alias], PROCESS_LOCAL_CACHES):
+            raise ImproperlyConfigured(
+                'core.sessions и core.auth.CachedModelBackend требуют '
+                f'общий для процессов кеш, а у «{alias}» '
+                f'{type(caches[alias]).__name__}'
+            )
@@ -0,0 +1,71 @@
+import copy
+import random
+import time
+
+from django.conf import settings
+from django.db import (DEFAULT_DB_ALIAS, OperationalError, connections,
+                       transaction)
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Применяет SQLITE_PRAGMAS к каждому новому соединению с SQLite.
+
+    Подключается к connection_created; при CONN_MAX_AGE соединение
+    живёт между запросами, и прагмы выполняются один раз на соединение.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def _snapshot(instance):
+    """Копия состояния объекта модели для _restore."""
+    return instance, dict(instance.__dict__), copy.copy(instance._state)
+
+
+def _restore(saved):
+    instance, attributes, state = saved
+    instance.__dict__ = dict(attributes)
+    instance._state = copy.copy(state)
+
+
+def write_with_retry(func, *args, using=DEFAULT_DB_ALIAS, instances=(),
+                     **kwargs):
+    """Выполняет func в transaction.atomic, повторяя её при блокировке.
+
+    busy_timeout ждёт освобождения базы, но при SQLITE_BUSY из-за
+    устаревшего снимка WAL SQLite отказывает сразу: тогда транзакция
+    перезапускается целиком, с паузой, растущей вдвое, и разбросом.
+    Внутри уже открытой транзакции повтор невозможен — ошибка уходит
+    наружу, к тому, кто её открыл.
+
+    Откат не трогает сами объекты: save() успевает записать в них pk
+    вставленной строки, а сигналы — запомненное состояние. Объекты
+    моделей из instances перед повтором возвращаются к виду до первой
+    попытки.
+    """
+    if connections[using].in_atomic_block:
+        with transaction.atomic(using=using):
+            return func(*args, **kwargs)
+    saved = [_snapshot(instance) for instance in instances]
+    attempts = settings.SQLITE_WRITE_RETRIES + 1
+    for attempt in range(attempts):
+        if attempt:
+            for item in saved:
+                _restore(item)
+        try:
+            with transaction.atomic(using=using):
+                return func(*args, **kwargs)
+        except OperationalError as error:
+            if not is_locked(error) or attempt == attempts - 1:
+                raise
+        time.sleep(
+            settings.SQLITE_WRITE_RETRY_DELAY * 2 ** attempt
+            * random.uniform(0.5, 1.5)
+        )
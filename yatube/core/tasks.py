@@ -0,0 +1,139 @@
+import json
+import logging
+import traceback
+from datetime import timedelta
+from functools import update_wrapper
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+SYNC = 'sync'
+ASYNC = 'async'
+DEFAULT_RETRY_DELAY = 30
+
+logger = logging.getLogger('yatube.tasks')
+
+
+class TaskFunction:
+    """Функция, которую можно вызвать сразу или поставить в очередь.
+
+    task.delay(*args) в режиме sync выполняет функцию на месте, в режиме
+    async кладёт строку Task в текущую транзакцию: воркер увидит её
+    только после коммита, и запрос не ждёт выполнения.
+    """
+
+    def __init__(self, func, mode, retries, retry_delay, dedupe):
+        update_wrapper(self, func)
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.default_mode = mode
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.dedupe = dedupe
+
+    def __call__(self, *args):
+        return self.func(*args)
+
+    @property
+    def mode(self):
+        if settings.TASKS_SYNC:
+            return SYNC
+        return settings.TASK_MODES.get(self.name, self.default_mode)
+
+    def delay(self, *args):
+        if self.mode == SYNC:
+            self.func(*args)
+            return None
+        return enqueue(self, args)
+
+
+def task(mode=ASYNC, retries=3, retry_delay=DEFAULT_RETRY_DELAY,
+         dedupe=True):
+    """Регистрирует функцию как фоновую задачу.
+
+    Аргументы должны сериализоваться в JSON. retry_delay — пауза перед
+    второй попыткой в секундах, дальше она удваивается. При dedupe
+    одинаковые вызовы, ещё ожидающие в очереди, не дублируются.
+    """
+    def decorator(func):
+        return TaskFunction(func, mode, retries, retry_delay, dedupe)
+    return decorator
+
+
+def enqueue(task_function, args):
+    args = json.dumps(list(args))
+    dedupe_key = None
+    if task_function.dedupe:
+        dedupe_key = f'{task_function.name}:{args}'
+    fields = {
+        'name': task_function.name,
+        'args': args,
+        'max_attempts': task_function.retries + 1,
+        'run_after': timezone.now(),
+    }
+    if dedupe_key is None:
+        return Task.objects.create(**fields)
+    try:
+        with transaction.atomic():
+            return Task.objects.create(dedupe_key=dedupe_key, **fields)
+    except IntegrityError:
+        return Task.objects.filter(dedupe_key=dedupe_key).first()
+
+
+def claim(limit):
+    """Забирает до limit готовых задач; безопасно для нескольких воркеров.
+
+    Задача считается взятой, только если условный UPDATE изменил строку.
+    Зависшие в running дольше TASK_LOCK_TIMEOUT задачи забираются снова.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+    ready = Q(status=Task.PENDING, run_after__lte=now) | Q(
+        status=Task.RUNNING, locked_at__lt=stale
+    )
+    candidates = Task.objects.filter(ready).order_by(
+        'run_after'
+    ).values_list('pk', flat=True)[:limit]
+    claimed = []
+    for task_id in candidates:
+        if Task.objects.filter(ready, pk=task_id).update(
+            status=Task.RUNNING, locked_at=now, dedupe_key=None
+        ):
+            claimed.append(task_id)
+    return list(Task.objects.filter(pk__in=claimed).order_by('run_after'))
+
+
+def execute(task_row):
+    """Выполняет взятую задачу: успех удаляет строку, ошибка — повтор
+    с экспоненциальной паузой или статус failed."""
+    retry_delay = DEFAULT_RETRY_DELAY
+    try:
+        task_function = import_string(task_row.name)
+        retry_delay = task_function.retry_delay
+        task_function.func(*json.loads(task_row.args))
+    except Exception:
+        error = traceback.format_exc()
+        attempts = task_row.attempts + 1
+        logger.warning('Задача %s упала (попытка %s)', task_row, attempts)
+        if attempts < task_row.max_attempts:
+            Task.objects.filter(pk=task_row.pk).update(
+                status=Task.PENDING,
+                attempts=attempts,
+                last_error=error,
+                locked_at=None,
+                run_after=timezone.now() + timedelta(
+                    seconds=retry_delay * 2 ** (attempts - 1)
+                ),
+            )
+        else:
+            Task.objects.filter(pk=task_row.pk).update(
+                status=Task.FAILED, attempts=attempts, last_error=error
+            )
+        return False
+    Task.objects.filter(pk=task_row.pk).delete()
+    return True
@@ -0,0 +1,119 @@
+import os
+import re
+import shutil
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, override_settings
+
+NUMBER = re.compile(r'\b\d+\b')
+STRING = re.compile(r"'[^']*'")
+
+
+@contextmanager
+def isolated_storage():
+    """Кеши в памяти процесса и медиа во временном каталоге на время тестов.
+
+    Тесты не трогают рабочий memcached, а миниатюры, которые при
+    TASKS_SYNC готовятся сразу, не остаются в рабочем каталоге media.
+    """
+    directory = tempfile.mkdtemp(prefix='yatube-tests-')
+    local = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    try:
+        with override_settings(
+            CACHES={
+                'default': local,
+                'shared': dict(local, LOCATION='shared'),
+            },
+            MEDIA_ROOT=os.path.join(directory, 'media'),
+        ):
+            yield directory
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class TestRunner(DiscoverRunner):
+    """DiscoverRunner, тесты которого не пишут в рабочие кеши и медиа."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._storage = isolated_storage()
+        self._storage.__enter__()
+
+    def teardown_test_environment(self, **kwargs):
+        self._storage.__exit__(None, None, None)
+        super().teardown_test_environment(**kwargs)
+
+
+def normalize(sql):
+    """SQL без конкретных значений: запросы N+1 сводятся к одному виду."""
+    return NUMBER.sub('?', STRING.sub('?', sql))
+
+
+def capture(func):
+    """Выполняет func и возвращает список выполненных SQL.
+
+    Потоковые ответы дочитываются: их запросы идут при отдаче тела.
+    """
+    with CaptureQueriesContext(connection) as context:
+        response = func()
+        if getattr(response, 'streaming', False):
+            b''.join(response.streaming_content)
+    return [query['sql'] for query in context.captured_queries]
+
+
+def query_report(queries, baseline=()):
+    """Запросы, которых больше, чем в baseline, по числу повторов."""
+    extra = Counter(map(normalize, queries))
+    extra.subtract(Counter(map(normalize, baseline)))
+    return '\n'.join(
+        f'  {count} x {sql}'
+        for sql, count in extra.most_common() if count > 0
+    )
+
+
+class QueryBudgetMixin:
+    """Проверки числа SQL-запросов для TestCase.
+
+    assertQueryBudget — не больше budget запросов; assertQueriesConstant —
+    число запросов не растёт вместе с данными (меньше — можно: короткой
+    ленте подписок нужен лишний запрос дочитывания). При провале в сообщении
+    перечислены лишние запросы, чтобы N+1 было видно сразу.
+    """
+
+    def assertQueryBudget(self, func, budget, msg=''):
+        queries = capture(func)
+        if len(queries) > budget:
+            self.fail(
+                f'{msg} {len(queries)} SQL при бюджете {budget}:\n'
+                + query_report(queries)
+            )
+        return queries
+
+    def assertQueriesConstant(self, targets, sizes, grow):
+        """Для каждого размера grow(size) наполняет базу, затем каждая цель
+        из targets {имя: (функция, бюджет)} выполняется в своём subTest."""
+        runs = {}
+        for size in sizes:
+            grow(size)
+            for name, (func, budget) in targets.items():
+                with self.subTest(view=name, size=size):
+                    runs.setdefault(name, []).append((
+                        size,
+                        self.assertQueryBudget(
+                            func, budget, f'{name}@{size}:'
+                        ),
+                    ))
+        for name, sized in runs.items():
+            (small_size, small), *rest = sized
+            for size, queries in rest:
+                with self.subTest(view=name, size=size):
+                    if len(queries) > len(small):
+                        self.fail(
+                            f'{name}: {len(small)} SQL при {small_size} '
+                            f'и {len(queries)} при {size}:\n'
+                            + query_report(queries, small)
+                        )
@@ -0,0 +1,131 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ..auth import USER_KEY
+from ..models import Task
+from ..sessions import SessionStore, require_shared_cache
+from ..tasks import execute
+
+User = get_user_model()
+
+
+class CachedAuthTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader', password='pw')
+
+    def setUp(self):
+        caches['shared'].clear()
+        self.user = User.objects.get(pk=self.user.pk)
+        self.client.force_login(self.user)
+        self.url = reverse('about:author')
+
+    def request_user(self):
+        return self.client.get(self.url).wsgi_request.user
+
+    def test_warm_request_hits_no_database(self):
+        """Повторный запрос вошедшего пользователя обходится без SQL."""
+        self.assertEqual(self.request_user(), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.request_user(), self.user)
+
+    def test_user_edit_invalidates_cache(self):
+        """Изменённый пользователь сразу виден в запросах."""
+        self.request_user()
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        self.assertEqual(self.request_user().first_name, 'Новое имя')
+
+    def test_password_change_ends_sessions(self):
+        """После смены пароля старая сессия больше не авторизует."""
+        self.request_user()
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertFalse(self.request_user().is_authenticated)
+
+    def test_logout_forgets_session_and_user(self):
+        """Выход удаляет сессию и пользователя из кеша."""
+        self.request_user()
+        self.client.post(reverse('users:logout'))
+        self.assertIsNone(caches['shared'].get(USER_KEY.format(self.user.pk)))
+        self.assertFalse(Session.objects.exists())
+        self.assertFalse(self.request_user().is_authenticated)
+
+
+@override_settings(TASKS_SYNC=False, TASK_MODES={})
+class SessionWriteTests(TestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.store = SessionStore()
+        self.store['step'] = 1
+        self.store.create()
+
+    def stored(self):
+        session = Session.objects.get(session_key=self.store.session_key)
+        return session.get_decoded()
+
+    def test_unchanged_session_is_not_saved(self):
+        """Сохранение тех же данных не пишет ни в кеш, ни в БД."""
+        store = SessionStore(self.store.session_key)
+        store['step'] = 1
+        with self.assertNumQueries(0):
+            store.save()
+        self.assertFalse(Task.objects.exists())
+
+    def test_changes_are_persisted_by_one_task(self):
+        """Несколько изменений подряд переносятся в БД одной задачей."""
+        for step in (2, 3, 4):
+            store = SessionStore(self.store.session_key)
+            store['step'] = step
+            store.save()
+            self.assertEqual(SessionStore(store.session_key)['step'], step)
+        self.assertEqual(self.stored(), {'step': 1})
+        self.assertEqual(Task.objects.count(), 1)
+        task = Task.objects.get()
+        self.assertTrue(execute(task))
+        self.assertEqual(self.stored(), {'step': 4})
+
+    def test_deleted_session_is_not_restored(self):
+        """Задача не воскрешает сессию, удалённую при выходе."""
+        self.store['step'] = 2
+        self.store.save()
+        self.store.delete()
+        self.assertTrue(execute(Task.objects.get()))
+        self.assertFalse(Session.objects.exists())
+
+
+class SharedCacheTests(SimpleTestCase):
+    LOCMEM = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+    DATABASE = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache',
+    }
+
+    @override_settings(
+        DEBUG=False, CACHES={'default': DATABASE, 'shared': LOCMEM}
+    )
+    def test_process_local_cache_fails(self):
+        """Без DEBUG кеш сессий в памяти процесса не даёт запуститься."""
+        with self.assertRaises(ImproperlyConfigured):
+            require_shared_cache()
+
+    @override_settings(
+        DEBUG=True, CACHES={'default': LOCMEM, 'shared': LOCMEM}
+    )
+    def test_process_local_cache_allowed_in_debug(self):
+        """С DEBUG один процесс runserver обходится кешем в памяти."""
+        require_shared_cache()
+
+    @override_settings(
+        DEBUG=False, CACHES={'default': LOCMEM, 'shared': DATABASE}
+    )
+    def test_shared_cache_passes(self):
+        """Проверяются только кеши сессий и пользователей, не default."""
+        require_shared_cache()
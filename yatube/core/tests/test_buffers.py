@@ -0,0 +1,45 @@
+from django.db import OperationalError
+from django.test import SimpleTestCase, override_settings
+
+from ..buffers import BufferedCounter
+
+
+@override_settings(TEST_FLUSH_SECONDS=3600, TEST_FLUSH_SIZE=3)
+class BufferedCounterTests(SimpleTestCase):
+    def setUp(self):
+        self.flushed = []
+        self.counter = BufferedCounter(
+            self.flushed.append, 'TEST_FLUSH_SECONDS', 'TEST_FLUSH_SIZE'
+        )
+
+    def test_flushes_aggregated_deltas_by_size(self):
+        """Приращения складываются и уходят одной пачкой по порогу."""
+        self.counter.incr('a')
+        self.counter.incr('b')
+        self.assertEqual(self.flushed, [])
+        self.counter.incr('a')
+        self.assertEqual(self.flushed, [{'a': 2, 'b': 1}])
+        self.assertEqual(self.counter.flush(), 0)
+
+    @override_settings(TEST_FLUSH_SECONDS=0)
+    def test_flushes_by_time(self):
+        """По истечении времени пачка пишется без набора порога."""
+        self.counter.incr('a')
+        self.assertEqual(self.flushed, [{'a': 1}])
+
+    def test_failed_flush_keeps_deltas(self):
+        """Упавшая запись возвращает приращения в буфер."""
+        def failing(deltas):
+            raise OperationalError('database is locked')
+        counter = BufferedCounter(
+            failing, 'TEST_FLUSH_SECONDS', 'TEST_FLUSH_SIZE'
+        )
+        with self.assertLogs('yatube.buffers', 'WARNING'):
+            counter.incr('a', 3)
+        self.assertEqual(counter.take(), {'a': 3})
+
+    def test_forked_child_starts_empty(self):
+        """После fork ребёнок не пишет приращения родителя."""
+        self.counter.incr('a')
+        self.counter._forked()
+        self.assertEqual(self.counter.take(), {})
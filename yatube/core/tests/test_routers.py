@@ -0,0 +1,84 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import AuthorStats, Group, Post, User
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    """default и replica — две отдельные SQLite-базы без репликации:
+    по содержимому страницы видно, с какой базы она прочитана."""
+
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.create(
+            text='Реплицированный пост', author=cls.user, group=cls.group
+        )
+        cls.replicate()
+
+    @classmethod
+    def replicate(cls):
+        for model in (User, Group, Post, AuthorStats):
+            model.objects.using('replica').all().delete()
+            model.objects.using('replica').bulk_create(
+                model.objects.using('default').all()
+            )
+
+    def setUp(self):
+        self.author_client = self.client_class()
+        self.author_client.force_login(self.user)
+
+    def test_reads_go_to_replica(self):
+        """Чтение в GET-запросе идёт с реплики, а не с default."""
+        Post.objects.create(text='Ещё не на реплике', author=self.user)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Реплицированный пост')
+        self.assertNotContains(response, 'Ещё не на реплике')
+
+    def test_writer_is_pinned_to_primary(self):
+        """После создания поста автор видит его, хотя реплика отстаёт."""
+        response = self.author_client.post(
+            reverse('posts:post_create'),
+            {'text': 'Свежий пост', 'group': self.group.pk},
+            follow=True,
+        )
+        self.assertRedirects(
+            response, reverse('posts:profile', args=(self.user.username,))
+        )
+        self.assertContains(response, 'Свежий пост')
+        self.assertIn('pin_primary', self.author_client.cookies)
+        self.assertNotContains(
+            self.client.get(response.request['PATH_INFO']), 'Свежий пост'
+        )
+
+    def test_pin_expires(self):
+        """Без cookie закрепления чтение снова идёт с реплики."""
+        self.author_client.post(
+            reverse('posts:post_create'), {'text': 'Свежий пост'}
+        )
+        del self.author_client.cookies['pin_primary']
+        response = self.author_client.get(
+            reverse('posts:profile', args=(self.user.username,))
+        )
+        self.assertNotContains(response, 'Свежий пост')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_is_primary(self):
+        """Пустой DATABASE_REPLICAS выключает маршрутизацию."""
+        Post.objects.create(text='Только в default', author=self.user)
+        self.assertContains(
+            self.client.get(reverse('posts:index')), 'Только в default'
+        )
+
+    def test_outside_requests_reads_are_primary(self):
+        """Команды и задачи вне запроса читают с основной базы."""
+        self.assertEqual(Post.objects.all().db, 'default')
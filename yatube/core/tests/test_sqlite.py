@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+from django.db import OperationalError, connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from ..sqlite import write_with_retry
+
+
+class PragmaTests(TestCase):
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_new_connections_are_tuned(self):
+        """Новое соединение с файлом SQLite получает WAL и прагмы."""
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = connections['default'].__class__({
+                **connection.settings_dict,
+                'NAME': os.path.join(directory, 'test.sqlite3'),
+            }, alias='pragmas')
+            try:
+                for name, value in (
+                    ('journal_mode', 'wal'),
+                    ('synchronous', 1),
+                    ('cache_size', -20000),
+                    ('busy_timeout', 5000),
+                ):
+                    with self.subTest(pragma=name):
+                        self.assertEqual(self.pragma(wrapper, name), value)
+            finally:
+                wrapper.close()
+
+
+@override_settings(SQLITE_WRITE_RETRIES=2, SQLITE_WRITE_RETRY_DELAY=0)
+class WriteRetryTests(TransactionTestCase):
+    def failing(self, *errors):
+        errors = list(errors)
+        calls = []
+
+        def write():
+            calls.append(connection.in_atomic_block)
+            if errors:
+                raise errors.pop(0)
+            return 'ok'
+        return write, calls
+
+    def test_retries_locked_transaction(self):
+        """Блокировка базы повторяет транзакцию целиком."""
+        write, calls = self.failing(
+            OperationalError('database is locked'),
+            OperationalError('database is locked'),
+        )
+        self.assertEqual(write_with_retry(write), 'ok')
+        self.assertEqual(calls, [True, True, True])
+
+    def test_gives_up_after_retries(self):
+        """После SQLITE_WRITE_RETRIES повторов ошибка уходит наружу."""
+        write, calls = self.failing(
+            *[OperationalError('database is locked')] * 3
+        )
+        with self.assertRaises(OperationalError):
+            write_with_retry(write)
+        self.assertEqual(len(calls), 3)
+
+    def test_other_errors_are_not_retried(self):
+        """Прочие ошибки базы не повторяются."""
+        write, calls = self.failing(OperationalError('no such table: x'))
+        with self.assertRaises(OperationalError):
+            write_with_retry(write)
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..models import Task
+from ..tasks import SYNC, claim, execute, task
+
+CALLS = []
+
+
+@task(retry_delay=10)
+def remember(value):
+    CALLS.append(value)
+
+
+@task(retries=1)
+def broken():
+    raise RuntimeError('сломалось')
+
+
+@override_settings(TASKS_SYNC=False, TASK_MODES={}, TASK_LOCK_TIMEOUT=60)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_delay_enqueues_without_running(self):
+        """delay в режиме async только кладёт задачу в очередь."""
+        row = remember.delay(1)
+        self.assertEqual(CALLS, [])
+        self.assertEqual(row.name, 'core.tests.test_tasks.remember')
+        self.assertEqual(row.args, '[1]')
+        self.assertEqual(row.status, Task.PENDING)
+
+    def test_sync_modes_run_immediately(self):
+        """TASKS_SYNC и TASK_MODES выполняют задачу на месте."""
+        for overrides in (
+            {'TASKS_SYNC': True},
+            {'TASK_MODES': {remember.name: SYNC}},
+        ):
+            with self.subTest(overrides=overrides):
+                CALLS.clear()
+                with self.settings(**overrides):
+                    self.assertIsNone(remember.delay(2))
+                self.assertEqual(CALLS, [2])
+        self.assertFalse(Task.objects.exists())
+
+    def test_dedupe(self):
+        """Одинаковый вызов, ещё ждущий в очереди, не дублируется."""
+        first = remember.delay(3)
+        self.assertEqual(remember.delay(3), first)
+        remember.delay(4)
+        self.assertEqual(Task.objects.count(), 2)
+        claim(10)
+        remember.delay(3)
+        self.assertEqual(Task.objects.filter(args='[3]').count(), 2)
+
+    def test_claim_and_execute(self):
+        """Воркер забирает задачу один раз и удаляет её после успеха."""
+        remember.delay(5)
+        tasks = claim(10)
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0].status, Task.RUNNING)
+        self.assertEqual(claim(10), [])
+        self.assertTrue(execute(tasks[0]))
+        self.assertEqual(CALLS, [5])
+        self.assertFalse(Task.objects.exists())
+
+    def test_not_ready_tasks_wait(self):
+        """Задача с run_after в будущем не забирается."""
+        row = remember.delay(6)
+        Task.objects.filter(pk=row.pk).update(
+            run_after=timezone.now() + timedelta(minutes=1)
+        )
+        self.assertEqual(claim(10), [])
+
+    def test_retry_with_backoff_then_fail(self):
+        """Упавшая задача повторяется позже, а затем помечается failed."""
+        broken.delay()
+        started = timezone.now()
+        with self.assertLogs('yatube.tasks', 'WARNING'):
+            self.assertFalse(execute(claim(10)[0]))
+        row = Task.objects.get()
+        self.assertEqual(row.status, Task.PENDING)
+        self.assertEqual(row.attempts, 1)
+        self.assertIn('сломалось', row.last_error)
+        self.assertGreaterEqual(
+            row.run_after, started + timedelta(seconds=broken.retry_delay)
+        )
+        Task.objects.update(run_after=timezone.now())
+        with self.assertLogs('yatube.tasks', 'WARNING'):
+            self.assertFalse(execute(claim(10)[0]))
+        row.refresh_from_db()
+        self.assertEqual(row.status, Task.FAILED)
+        self.assertEqual(row.attempts, 2)
+        self.assertEqual(claim(10), [])
+
+    def test_stale_lock_is_taken_over(self):
+        """Задачу зависшего воркера забирает другой после таймаута."""
+        remember.delay(7)
+        claim(10)
+        Task.objects.update(locked_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(len(claim(10)), 1)
+
+    def test_run_tasks_command(self):
+        """run_tasks --once выполняет все готовые задачи и выходит."""
+        for value in range(3):
+            remember.delay(value)
+        call_command('run_tasks', '--once', '--workers', '0',
+                     stdout=StringIO())
+        self.assertEqual(sorted(CALLS), [0, 1, 2])
+        self.assertFalse(Task.objects.exists())
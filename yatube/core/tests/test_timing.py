@@ -0,0 +1,55 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        Post.objects.create(text='Тестовый пост', author=cls.user)
+
+    def timings(self, response):
+        timings = {}
+        for metric in response['Server-Timing'].split(', '):
+            name, duration, *_ = metric.split(';')
+            timings[name] = float(duration[len('dur='):])
+        return timings
+
+    def test_header_reports_sql_render_and_view(self):
+        """Заголовок Server-Timing содержит SQL, рендер и время view."""
+        response = self.client.get(
+            reverse('posts:profile', args=(self.user.username,))
+        )
+        metrics = response.wsgi_request.metrics
+        timings = self.timings(response)
+        self.assertEqual(set(timings), {'db', 'render', 'view', 'total'})
+        self.assertIn(f'desc="{metrics.queries} SQL"',
+                      response['Server-Timing'])
+        self.assertGreater(metrics.queries, 0)
+        self.assertGreater(timings['render'], 0)
+        self.assertLessEqual(timings['view'], timings['total'])
+        self.assertLessEqual(timings['render'], timings['view'])
+
+    def test_log_line(self):
+        """По каждому запросу пишется JSON-строка с метриками."""
+        with self.assertLogs('yatube.timing', 'INFO') as logs:
+            response = self.client.get(reverse('posts:index'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], reverse('posts:index'))
+        self.assertEqual(record['view'], 'posts:index')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(
+            record['queries'], response.wsgi_request.metrics.queries
+        )
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_can_be_disabled(self):
+        """Заголовок отключается настройкой, метрики собираются."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertGreater(response.wsgi_request.metrics.queries, 0)
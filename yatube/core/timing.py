@@ -0,0 +1,114 @@
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    """Счётчики одного запроса: SQL, рендер шаблонов и время view."""
+
+    __slots__ = ('queries', 'db_ms', 'render_ms', 'view_ms', 'total_ms',
+                 'view_started', '_render_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.render_ms = 0.0
+        self.view_ms = None
+        self.total_ms = None
+        self.view_started = None
+        self._render_depth = 0
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_ms += (time.perf_counter() - started) * 1000
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_ms, 2),
+            'render_ms': round(self.render_ms, 2),
+            'view_ms': _round(self.view_ms),
+            'total_ms': _round(self.total_ms),
+        }
+
+    def server_timing(self):
+        metrics = [
+            f'db;dur={self.db_ms:.2f};desc="{self.queries} SQL"',
+            f'render;dur={self.render_ms:.2f}',
+        ]
+        if self.view_ms is not None:
+            metrics.append(f'view;dur={self.view_ms:.2f}')
+        if self.total_ms is not None:
+            metrics.append(f'total;dur={self.total_ms:.2f}')
+        return ', '.join(metrics)
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def current_metrics():
+    return getattr(_local, 'metrics', None)
+
+
+@contextmanager
+def collect_metrics():
+    """Собирает метрики кода внутри блока в новый RequestMetrics.
+
+    SQL считается через execute_wrapper всех подключений потока, поэтому
+    работает и при DEBUG = False, в отличие от connection.queries.
+    """
+    metrics = RequestMetrics()
+    previous = current_metrics()
+    _local.metrics = metrics
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(metrics.execute)
+                )
+            yield metrics
+    finally:
+        _local.metrics = previous
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        metrics = current_metrics()
+        if metrics is None:
+            return super().render(context, request)
+        metrics._render_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics._render_depth -= 1
+            if not metrics._render_depth:
+                metrics.render_ms += (time.perf_counter() - started) * 1000
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """Штатный бэкенд шаблонов, учитывающий время рендера в метриках.
+
+    Вложенные рендеры (например, карточек постов) входят во время
+    внешнего шаблона и отдельно не суммируются.
+    """
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
@@ -1,20 +1,88 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.db.models import Sum
 
-from .models import Group, Post
+from core.changelist import LargeTableAdmin
 
+from . import bulk
+from .models import AuthorStats, Follow, Group, Post, PostPopularity
+from .search import matching_posts
 
-class PostAdmin(admin.ModelAdmin):
+
+class PostActionForm(ActionForm):
+    group = forms.CharField(
+        label='Слаг группы',
+        required=False,
+        help_text='Для действия «Перенести в группу»',
+    )
+
+
+class PostAdmin(LargeTableAdmin, admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_select_related = ('author', 'group')
     list_editable = ('group',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('group',)
+    action_form = PostActionForm
+    actions = ('move_to_group', 'delete_author_posts')
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return matching_posts(queryset, search_term), False
+
+    def estimated_count(self, request, queryset, filtered):
+        if filtered:
+            return super().estimated_count(request, queryset, filtered)
+        total = AuthorStats.objects.aggregate(total=Sum('post_count'))
+        return total['total'] or 0, False
+
+    def move_to_group(self, request, queryset):
+        slug = request.POST.get('group', '').strip()
+        group = Group.objects.filter(slug=slug).first()
+        if group is None:
+            self.message_user(
+                request, f'Группа «{slug}» не найдена', messages.ERROR
+            )
+            return
+        moved = bulk.move_posts(queryset, group)
+        self.message_user(request, f'Перенесено в «{group}»: {moved}')
+    move_to_group.short_description = 'Перенести в группу'
+    move_to_group.allowed_permissions = ('change',)
+
+    def delete_author_posts(self, request, queryset):
+        deleted = bulk.delete_author_posts(
+            queryset.order_by().values_list('author_id', flat=True).distinct()
+        )
+        self.message_user(request, f'Удалено постов: {deleted}')
+    delete_author_posts.short_description = (
+        'Удалить все посты авторов выбранных постов'
+    )
+    delete_author_posts.allowed_permissions = ('delete',)
 
-class GroupAdmin(admin.ModelAdmin):
-    list_display = ("pk", "description", "title", "slug")
+
+class GroupAdmin(LargeTableAdmin, admin.ModelAdmin):
+    list_display = ("pk", "description", "title", "slug", "post_count")
     search_fields = ("description", "title")
+    ordering = ('-pk',)
+
+
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author', 'created')
+    raw_id_fields = ('user', 'author')
+
+
+class PostPopularityAdmin(admin.ModelAdmin):
+    list_display = ('post', 'views', 'score', 'updated')
+    raw_id_fields = ('post',)
+    ordering = ('-score',)
 
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(Follow, FollowAdmin)
+admin.site.register(PostPopularity, PostPopularityAdmin)
@@ -0,0 +1,128 @@
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from .models import Group, Post, User
+from .utils import (FORWARD, CursorPaginator, after_key, decode_cursor,
+                    encode_key)
+
+FIELDS = {
+    'id': 'pk',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'modified': 'modified',
+    'author': 'author__username',
+    'group': 'group__slug',
+}
+DEFAULT_FIELDS = ('id', 'text', 'pub_date', 'author', 'group')
+MAX_LIMIT = 100
+
+encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_fields(request):
+    raw = request.GET.get('fields')
+    if not raw:
+        return DEFAULT_FIELDS
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()
+    ))
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown or not fields:
+        raise ApiError(
+            'Неизвестные поля: {}. Доступны: {}.'.format(
+                ', '.join(unknown) or '—', ', '.join(FIELDS)
+            )
+        )
+    return fields
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.POSTS_IN_PAGE))
+    except ValueError:
+        raise ApiError('limit должен быть целым числом.')
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def feed_rows(queryset, fields, cursor=None, limit=None):
+    """Кортежи значений страницы ленты и курсор следующей страницы.
+
+    Один запрос по индексу ленты без создания экземпляров моделей: в
+    выборку попадают только нужные поля и ключ (pub_date, pk).
+    """
+    limit = limit or settings.POSTS_IN_PAGE
+    queryset = queryset.order_by(*CursorPaginator.ordering)
+    position = decode_cursor(cursor)
+    if position is not None:
+        _, pub_date, pk = position
+        queryset = after_key(queryset, pub_date, pk)
+    rows = list(queryset.values_list(
+        *(FIELDS[name] for name in fields), 'pub_date', 'pk'
+    )[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        *_, pub_date, pk = rows[-1]
+        next_cursor = encode_key(FORWARD, pk, pub_date.isoformat())
+    return [row[:-2] for row in rows], next_cursor
+
+
+def stream_feed(fields, rows, next_cursor):
+    yield '{"results": ['
+    for number, row in enumerate(rows):
+        yield (',' if number else '') + encoder.encode(dict(zip(fields, row)))
+    yield '], "next": {}}}'.format(json.dumps(next_cursor))
+
+
+def feed_response(request, queryset, exists=None):
+    """Отдаёт страницу ленты потоковым JSON.
+
+    exists вызывается только для пустой первой страницы, чтобы отличить
+    пустую ленту от несуществующей группы или автора.
+    """
+    try:
+        fields = parse_fields(request)
+        limit = parse_limit(request)
+    except ApiError as error:
+        return JsonResponse({'error': str(error)}, status=error.status)
+    cursor = request.GET.get('cursor')
+    rows, next_cursor = feed_rows(queryset, fields, cursor, limit)
+    if not rows and not cursor and exists is not None and not exists():
+        return JsonResponse({'error': 'Не найдено.'}, status=404)
+    return StreamingHttpResponse(
+        stream_feed(fields, rows, next_cursor),
+        content_type='application/json',
+    )
+
+
+@require_GET
+def index(request):
+    return feed_response(request, Post.objects.all())
+
+
+@require_GET
+def group_posts(request, slug):
+    return feed_response(
+        request,
+        Post.objects.filter(group__slug=slug),
+        Group.objects.filter(slug=slug).exists,
+    )
+
+
+@require_GET
+def profile(request, username):
+    return feed_response(
+        request,
+        Post.objects.filter(author__username=username),
+        User.objects.filter(username=username).exists,
+    )
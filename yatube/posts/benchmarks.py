@@ -0,0 +1,326 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from copy import deepcopy
+from datetime import timedelta
+from itertools import accumulate
+from statistics import mean, median
+
+from django.conf import settings
+from django.db import (OperationalError, close_old_connections, connection,
+                       connections, transaction)
+from django.template.loader import get_template
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from .bulk_import import insert_sql
+from .counters import rebuild as rebuild_counters
+from .models import RENDERED_FIELDS, Group, Post, User, render_text
+from .templatetags.post_cards import CARD_TEMPLATE, card_context
+from .utils import FORWARD, CursorPaginator, encode_cursor
+
+SEED_BATCH_SIZE = 10000
+WORDS = (
+    'город', 'река', 'кошка', 'поезд', 'музыка', 'книга', 'дождь', 'утро',
+    'кофе', 'горы', 'море', 'python', 'django', 'работа', 'отпуск', 'лес',
+    'вечер', 'друзья', 'фильм', 'спорт', 'машина', 'сад', 'зима', 'лето',
+)
+WORDS_PER_POST = 10
+RARE_WORDS = 5000
+PERCENTILES = (50, 90, 99)
+
+
+@contextmanager
+def bench_database(keepdb=False, file_name=None):
+    """Отдельная тестовая БД, чтобы замеры не трогали рабочие данные.
+
+    file_name задаёт файл вместо базы в памяти: он нужен, когда к базе
+    ходят несколько соединений из разных потоков.
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict['TEST']
+    old_test_name = test_settings.get('NAME')
+    if file_name:
+        test_settings['NAME'] = file_name
+    try:
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=keepdb
+        )
+        try:
+            yield
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=keepdb
+            )
+    finally:
+        test_settings['NAME'] = old_test_name
+
+
+def seed_posts(total, authors=10, groups=10, skew=0.0, prefix='bench',
+               batch_size=SEED_BATCH_SIZE):
+    """Быстро наполняет базу постами через executemany, минуя ORM.
+
+    Посты получают различающиеся pub_date с шагом в секунду. Авторы и
+    группы выбираются по закону Ципфа с показателем skew (0 — поровну),
+    так что первый автор и первая группа самые плодовитые. Текст — частые
+    слова из WORDS и пара редких «тегов», чтобы у поиска были и широкие,
+    и узкие запросы. Возвращает id авторов и групп по убыванию веса.
+    """
+    rng = random.Random(total)
+    User.objects.bulk_create(
+        User(username=f'{prefix}-{number}', password='!')
+        for number in range(authors)
+    )
+    Group.objects.bulk_create(
+        Group(title=f'{prefix}-{number}', slug=f'{prefix}-{number}',
+              description='')
+        for number in range(groups)
+    )
+    author_ids = list(User.objects.filter(
+        username__startswith=f'{prefix}-'
+    ).order_by('pk').values_list('pk', flat=True))
+    group_ids = list(Group.objects.filter(
+        slug__startswith=f'{prefix}-'
+    ).order_by('pk').values_list('pk', flat=True))
+    author_weights = _zipf_weights(len(author_ids), skew)
+    group_weights = _zipf_weights(len(group_ids), skew)
+    insert = insert_sql(Post, (
+        'text', 'pub_date', 'modified', 'author_id', 'group_id', 'image',
+        'thumbnails', *RENDERED_FIELDS,
+    ))
+    start = timezone.now() - timedelta(seconds=total)
+    adapt = connection.ops.adapt_datetimefield_value
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(0, total, batch_size):
+            size = min(batch_size, total - offset)
+            post_authors = rng.choices(
+                author_ids, cum_weights=author_weights, k=size
+            )
+            post_groups = rng.choices(
+                group_ids, cum_weights=group_weights, k=size
+            ) if group_ids else [None] * size
+            texts = [_post_text(rng) for _ in range(size)]
+            rendered = [render_text(text) for text in texts]
+            cursor.executemany(insert, [
+                (
+                    text,
+                    adapt(start + timedelta(seconds=offset + number)),
+                    adapt(start + timedelta(seconds=offset + number)),
+                    post_authors[number],
+                    post_groups[number],
+                    '',
+                    '',
+                    *(rendered[number][field] for field in RENDERED_FIELDS),
+                )
+                for number, text in enumerate(texts)
+            ])
+        rebuild_counters()
+    return author_ids, group_ids
+
+
+def _zipf_weights(count, skew):
+    return list(accumulate(1 / (rank + 1) ** skew for rank in range(count)))
+
+
+def _post_text(rng):
+    words = rng.choices(WORDS, k=WORDS_PER_POST) + [
+        f'тег{rng.randrange(RARE_WORDS)}' for _ in range(2)
+    ]
+    rng.shuffle(words)
+    return ' '.join(words)
+
+
+def cursor_at(queryset, offset):
+    """Курсор страницы, начинающейся с позиции offset ленты."""
+    if not offset:
+        return None
+    ordered = queryset.order_by(*CursorPaginator.ordering)
+    return encode_cursor(FORWARD, ordered[offset - 1])
+
+
+def timed(func, repeat=5):
+    """Медиана времени выполнения func в миллисекундах."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return median(samples)
+
+
+def percentile(samples, percent):
+    ordered = sorted(samples)
+    return ordered[round(percent / 100 * (len(ordered) - 1))]
+
+
+def summarize(samples):
+    summary = {
+        f'p{percent}': percentile(samples, percent)
+        for percent in PERCENTILES
+    }
+    summary.update(mean=mean(samples), min=min(samples), max=max(samples))
+    return summary
+
+
+def feed_targets(view, url, queryset, per_page):
+    """Первая, средняя и последняя страницы ленты."""
+    last = max(queryset.count() - 1, 0) // per_page * per_page
+    pages = (
+        ('first', 0),
+        ('middle', last // 2 // per_page * per_page),
+        ('last', last),
+    )
+    return [
+        {
+            'view': view, 'page': page, 'method': 'get', 'url': url,
+            'data': {'cursor': cursor_at(queryset, offset)} if offset else {},
+        }
+        for page, offset in pages
+    ]
+
+
+def view_targets(author, group, post, per_page):
+    """Сценарии замеров для всех представлений posts.
+
+    post должен принадлежать author: правку замеряем от имени автора.
+    """
+    targets = feed_targets(
+        'index', reverse('posts:index'), Post.objects.all(), per_page
+    )
+    targets += feed_targets(
+        'group_posts', reverse('posts:group_list', args=(group.slug,)),
+        group.posts.all(), per_page,
+    )
+    targets += feed_targets(
+        'profile', reverse('posts:profile', args=(author.username,)),
+        author.posts.all(), per_page,
+    )
+    detail = reverse('posts:post_detail', args=(post.pk,))
+    create = reverse('posts:post_create')
+    edit = reverse('posts:post_edit', args=(post.pk,))
+    form = {'text': 'Текст из бенчмарка', 'group': group.pk}
+    for view, method, url, data in (
+        ('post_detail', 'get', detail, {}),
+        ('post_create', 'get', create, {}),
+        ('post_create', 'post', create, form),
+        ('post_edit', 'get', edit, {}),
+        ('post_edit', 'post', edit, form),
+    ):
+        targets.append({'view': view, 'page': None, 'method': method,
+                        'url': url, 'data': data})
+    return targets
+
+
+def run_view_benchmarks(targets, client=None, repeat=20, warmup=2):
+    """Замеряет задержку, число SQL-запросов и время рендера.
+
+    SQL и рендер берутся из метрик ServerTimingMiddleware.
+    """
+    client = client or Client()
+    results = []
+    for target in targets:
+        request = getattr(client, target['method'])
+        for _ in range(warmup):
+            request(target['url'], target['data'])
+        samples = []
+        renders = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = request(target['url'], target['data'])
+            samples.append((time.perf_counter() - started) * 1000)
+            if response.wsgi_request.metrics.render_ms:
+                renders.append(response.wsgi_request.metrics.render_ms)
+        results.append({
+            'view': target['view'],
+            'page': target['page'],
+            'method': target['method'].upper(),
+            'url': target['url'],
+            'status': response.status_code,
+            'queries': response.wsgi_request.metrics.queries,
+            'latency_ms': summarize(samples),
+            'render_ms': summarize(renders) if renders else None,
+        })
+    return results
+
+
+def run_concurrent(read, write, threads=8, seconds=5.0, write_ratio=0.1):
+    """Гоняет смешанную нагрузку из threads потоков seconds секунд.
+
+    read и write получают генератор случайных чисел потока; доля записей
+    write_ratio. После каждой операции, как в конце запроса, вызывается
+    close_old_connections(): без CONN_MAX_AGE соединение открывается
+    заново. OperationalError («database is locked») считается ошибкой.
+    """
+    deadline = time.perf_counter() + seconds
+    start = threading.Barrier(threads)
+
+    def worker(number):
+        rng = random.Random(number)
+        stats = {'reads': 0, 'writes': 0, 'errors': 0, 'samples': []}
+        start.wait()
+        while time.perf_counter() < deadline:
+            is_write = rng.random() < write_ratio
+            started = time.perf_counter()
+            try:
+                (write if is_write else read)(rng)
+            except OperationalError:
+                stats['errors'] += 1
+            else:
+                stats['writes' if is_write else 'reads'] += 1
+                stats['samples'].append(
+                    (time.perf_counter() - started) * 1000
+                )
+            finally:
+                close_old_connections()
+        connections.close_all()
+        return stats
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - started
+    samples = [sample for stats in results for sample in stats['samples']]
+    total = {
+        key: sum(stats[key] for stats in results)
+        for key in ('reads', 'writes', 'errors')
+    }
+    total['ops_per_s'] = (total['reads'] + total['writes']) / elapsed
+    total['latency_ms'] = summarize(samples) if samples else None
+    return total
+
+
+class ReverseUrls:
+    """Адреса через reverse() для каждой карточки, как делал {% url %}."""
+
+    def detail(self, pk):
+        return reverse('posts:post_detail', args=(pk,))
+
+    def profile(self, username):
+        return reverse('posts:profile', args=(username,))
+
+    def group(self, slug):
+        return reverse('posts:group_list', args=(slug,))
+
+
+def render_cards_one_by_one(posts, flag_profile=False):
+    """Прежний путь: шаблон, контекст и URL заново для каждой карточки."""
+    return [
+        get_template(CARD_TEMPLATE).render(
+            card_context(post, flag_profile, ReverseUrls())
+        )
+        for post in posts
+    ]
+
+
+def template_settings(cached):
+    """TEMPLATES с кеширующим загрузчиком или без него."""
+    templates = deepcopy(settings.TEMPLATES)
+    loaders = settings.TEMPLATE_LOADERS
+    if cached:
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    templates[0]['OPTIONS']['loaders'] = loaders
+    return templates
@@ -0,0 +1,74 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import invalidate_on_commit
+from .counters import recount_groups
+from .models import AuthorStats, Post, PostPopularity, TimelineEntry
+
+POST = Post._meta.db_table
+
+
+def _tags(author_ids, group_ids):
+    return ['feed:index'] + [
+        f'author:{author_id}' for author_id in author_ids
+    ] + [
+        f'group:{group_id}' for group_id in group_ids if group_id is not None
+    ]
+
+
+def move_posts(queryset, group):
+    """Переносит посты queryset в group одним UPDATE.
+
+    Счётчики затронутых групп пересчитываются одним UPDATE с подзапросом,
+    страницы сбрасываются по тегам авторов и групп, а не поста за постом.
+    Возвращает число перенесённых постов.
+    """
+    posts = Post.objects.filter(
+        pk__in=queryset.order_by().values('pk')
+    ).exclude(group=group)
+    with transaction.atomic():
+        rows = set(posts.order_by().values_list(
+            'author_id', 'group_id'
+        ).distinct())
+        moved = posts.update(group=group, modified=timezone.now())
+        group_ids = {group_id for _, group_id in rows} | {group.pk}
+        recount_groups(group_ids)
+    invalidate_on_commit(*_tags(
+        {author_id for author_id, _ in rows}, group_ids
+    ))
+    return moved
+
+
+def delete_author_posts(author_ids):
+    """Удаляет все посты авторов по одному DELETE на таблицу.
+
+    Записи лент и популярности удаляются своими DELETE до постов,
+    поисковый индекс чистит триггер. Сигналы постов не вызываются:
+    счётчики авторов обнуляются, счётчики групп пересчитываются.
+    Возвращает число удалённых постов.
+    """
+    author_ids = list(author_ids)
+    if not author_ids:
+        return 0
+    posts = Post.objects.filter(author_id__in=author_ids)
+    with transaction.atomic():
+        group_ids = set(posts.order_by().values_list(
+            'group_id', flat=True
+        ).distinct())
+        TimelineEntry.objects.filter(
+            post__author_id__in=author_ids
+        ).delete()
+        PostPopularity.objects.filter(post__author_id__in=author_ids).delete()
+        placeholders = ', '.join(['%s'] * len(author_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {POST} WHERE author_id IN ({placeholders})',
+                author_ids,
+            )
+            deleted = cursor.rowcount
+        AuthorStats.objects.filter(author_id__in=author_ids).update(
+            post_count=0
+        )
+        recount_groups(group_ids)
+    invalidate_on_commit(*_tags(author_ids, group_ids))
+    return deleted
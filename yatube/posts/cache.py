@@ -0,0 +1,217 @@
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.views.decorators.http import condition
+
+from core.buffers import BufferedCounter
+
+PAGE_KEY = 'page:{}:{}'
+TAG_KEY = 'tag:{}'
+MODIFIED_KEY = 'modified:{}'
+STATS_KEY = 'page-cache:{}'
+STATS = ('hits', 'misses', 'invalidations')
+PAGE_PARAMS = ('cursor', 'page')
+
+
+def post_tags(post_id, *author_and_group_ids):
+    author_ids = {author_id for author_id, _ in author_and_group_ids}
+    group_ids = {group_id for _, group_id in author_and_group_ids}
+    return ['feed:index', f'post:{post_id}'] + [
+        f'author:{author_id}' for author_id in author_ids
+        if author_id is not None
+    ] + [
+        f'group:{group_id}' for group_id in group_ids
+        if group_id is not None
+    ]
+
+
+def tag_versions(tags):
+    """Текущие версии тегов; пропавший тег получает новую версию."""
+    keys = {TAG_KEY.format(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, time.time_ns(), None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def tags_modified(tags):
+    """Время последнего сброса любого из тегов.
+
+    Для тега без отметки (новый или вытесненный из кеша) отметкой
+    становится текущее время: ответ просто будет считаться свежим.
+    """
+    keys = [MODIFIED_KEY.format(tag) for tag in tags]
+    stamps = cache.get_many(keys)
+    for key in set(keys) - stamps.keys():
+        cache.add(key, time.time(), None)
+        stamps[key] = cache.get(key)
+    return datetime.fromtimestamp(max(stamps.values()), timezone.utc)
+
+
+def invalidate_tags(*tags):
+    for tag in tags:
+        try:
+            cache.incr(TAG_KEY.format(tag))
+        except ValueError:
+            pass
+    now = time.time()
+    cache.set_many({MODIFIED_KEY.format(tag): now for tag in tags}, None)
+    count_stat('invalidations', len(tags))
+
+
+def invalidate_on_commit(*tags):
+    """Сбрасывает теги сразу и ещё раз после коммита.
+
+    Повторный сброс не даёт параллельному запросу закешировать страницу,
+    отрисованную до коммита.
+    """
+    invalidate_tags(*tags)
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def write_stats(deltas):
+    for name, delta in deltas.items():
+        key = STATS_KEY.format(name)
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            pass
+
+
+stats_counter = BufferedCounter(
+    write_stats,
+    'PAGE_CACHE_STATS_FLUSH_SECONDS',
+    'PAGE_CACHE_STATS_FLUSH_SIZE',
+)
+
+
+def count_stat(name, delta=1):
+    """Копит статистику в памяти процесса: запрос не пишет в кеш."""
+    stats_counter.incr(name, delta)
+
+
+def page_cache_stats():
+    """Статистика всех процессов; буфер текущего сбрасывается сразу."""
+    stats_counter.flush()
+    stats = {
+        name: cache.get(STATS_KEY.format(name), 0) for name in STATS
+    }
+    requests = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / requests if requests else 0.0
+    return stats
+
+
+def reset_page_cache_stats():
+    stats_counter.take()
+    cache.delete_many([STATS_KEY.format(name) for name in STATS])
+
+
+def tag_page(request, *tags):
+    """Привязывает кешируемую страницу к тегам.
+
+    Версии тегов снимаются в момент вызова, поэтому вызывать нужно до
+    выборки данных, из которых строится страница.
+    """
+    tagged = getattr(request, 'page_cache_tags', None)
+    if tagged is not None:
+        tagged.update(tag_versions(tags))
+
+
+def _page_key(request, view, args, kwargs):
+    params = sorted(
+        (name, request.GET[name]) for name in PAGE_PARAMS
+        if name in request.GET
+    )
+    raw = repr((args, sorted(kwargs.items()), params)).encode()
+    return PAGE_KEY.format(view.__name__, md5(raw).hexdigest())
+
+
+def cache_anonymous_page(*tags):
+    """Кеширует HTML страницы для анонимных пользователей.
+
+    Запись хранит версии тегов на момент рендера и считается устаревшей,
+    как только версия любого тега изменится.
+    """
+    return _tagged_cache(tags, 'PAGE_CACHE_TIMEOUT', anonymous_only=True)
+
+
+def cache_shared_page(*tags):
+    """Как cache_anonymous_page, но для ответов, не зависящих от
+    пользователя (ленты Atom/RSS): одна запись на всех."""
+    return _tagged_cache(tags, 'FEED_CACHE_TIMEOUT', anonymous_only=False)
+
+
+def _tagged_cache(tags, timeout_setting, anonymous_only):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = getattr(settings, timeout_setting)
+            if (not timeout or request.method not in ('GET', 'HEAD')
+                    or anonymous_only and request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            key = _page_key(request, view, args, kwargs)
+            entry = cache.get(key)
+            if entry and tag_versions(entry['tags']) == entry['tags']:
+                count_stat('hits')
+                response = HttpResponse(
+                    entry['content'], content_type=entry['content_type']
+                )
+                response['X-Page-Cache'] = 'hit'
+                return response
+            count_stat('misses')
+            request.page_cache_tags = tag_versions(tags)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, {
+                    'tags': request.page_cache_tags,
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                }, timeout)
+            response['X-Page-Cache'] = 'miss'
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_page(get_tags):
+    """Отвечает 304 на If-None-Match / If-Modified-Since без рендера.
+
+    get_tags(request, *args, **kwargs) возвращает теги страницы дешёвым
+    запросом или None, если объекта нет. ETag строится из версий тегов,
+    адреса и пользователя. Last-Modified — из отметок сброса тегов и
+    только для анонимных запросов: в нём нет пользователя, и по
+    If-Modified-Since клиент получил бы 304 на страницу, отрисованную
+    для другого состояния входа.
+    """
+    def validators(request, *args, **kwargs):
+        if not hasattr(request, 'page_validators'):
+            tags = get_tags(request, *args, **kwargs)
+            request.page_validators = (None, None)
+            if tags is not None:
+                raw = repr((
+                    request.get_full_path(),
+                    request.user.pk,
+                    sorted(tag_versions(tags).items()),
+                )).encode()
+                request.page_validators = (
+                    md5(raw).hexdigest(),
+                    None if request.user.is_authenticated
+                    else tags_modified(tags),
+                )
+        return request.page_validators
+
+    def etag(request, *args, **kwargs):
+        return validators(request, *args, **kwargs)[0]
+
+    def last_modified(request, *args, **kwargs):
+        return validators(request, *args, **kwargs)[1]
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import AuthorStats, Group, Post, User
+
+
+def _shifted(delta):
+    """post_count + delta, но не меньше нуля.
+
+    Посты, вставленные в обход сигналов, в счётчиках не учтены, и их
+    удаление до rebuild иначе увело бы счётчик в минус.
+    """
+    return Greatest(F('post_count') + delta, Value(0))
+
+
+def change_author_count(author_id, delta):
+    updated = AuthorStats.objects.filter(author_id=author_id).update(
+        post_count=_shifted(delta)
+    )
+    if not updated and delta > 0:
+        AuthorStats.objects.get_or_create(
+            author_id=author_id,
+            defaults={
+                'post_count': Post.objects.filter(author_id=author_id).count()
+            },
+        )
+
+
+def change_group_count(group_id, delta):
+    Group.objects.filter(pk=group_id).update(
+        post_count=_shifted(delta)
+    )
+
+
+def recount_groups(group_ids):
+    """Пересчитывает счётчики групп group_ids одним UPDATE."""
+    Group.objects.filter(pk__in=group_ids).update(
+        post_count=_actual_count('group')
+    )
+
+
+def _actual_count(field):
+    return Coalesce(
+        Subquery(
+            Post.objects.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        Value(0),
+    )
+
+
+def find_mismatches():
+    """Возвращает [(объект, в счётчике, на самом деле)]."""
+    groups = Group.objects.annotate(actual=_actual_count('group')).exclude(
+        post_count=F('actual')
+    )
+    authors = User.objects.annotate(
+        counted=Coalesce('post_stats__post_count', Value(0)),
+        actual=_actual_count('author'),
+    ).exclude(counted=F('actual'))
+    return [
+        (group, group.post_count, group.actual) for group in groups
+    ] + [
+        (author, author.counted, author.actual) for author in authors
+    ]
+
+
+@transaction.atomic
+def rebuild():
+    """Пересчитывает все счётчики несколькими set-based запросами."""
+    Group.objects.update(post_count=_actual_count('group'))
+    AuthorStats.objects.bulk_create(
+        (
+            AuthorStats(author_id=author_id)
+            for author_id in User.objects.filter(
+                post_stats__isnull=True, posts__isnull=False
+            ).values_list('pk', flat=True).distinct()
+        ),
+        ignore_conflicts=True,
+    )
+    AuthorStats.objects.update(post_count=_actual_count('author'))
@@ -0,0 +1,143 @@
+import csv
+import zlib
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Group, Post, User
+
+FORMATS = ('csv', 'jsonl')
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+COLUMNS = (
+    ('id', 'pk'),
+    ('text', 'text'),
+    ('pub_date', 'pub_date'),
+    ('modified', 'modified'),
+    ('author', 'author__username'),
+    ('group', 'group__slug'),
+)
+CHUNK_SIZE = 2000
+
+encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+class ExportError(ValueError):
+    pass
+
+
+def parse_moment(value, name):
+    """Дата или дата-время из строки; дата означает начало дня."""
+    if not value:
+        return None
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            moment = day and datetime.combine(day, time.min)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ExportError(f'{name}: ожидается дата ГГГГ-ММ-ДД[ ЧЧ:ММ]')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_queryset(group=None, author=None, since=None, until=None):
+    """Посты для выгрузки; since включительно, until — нет."""
+    queryset = Post.objects.all()
+    if group:
+        group_id = Group.objects.filter(slug=group).values_list(
+            'pk', flat=True
+        ).first()
+        if group_id is None:
+            raise ExportError(f'Нет группы {group}')
+        queryset = queryset.filter(group_id=group_id)
+    if author:
+        author_id = User.objects.filter(username=author).values_list(
+            'pk', flat=True
+        ).first()
+        if author_id is None:
+            raise ExportError(f'Нет автора {author}')
+        queryset = queryset.filter(author_id=author_id)
+    since = parse_moment(since, 'since')
+    until = parse_moment(until, 'until')
+    if since:
+        queryset = queryset.filter(pub_date__gte=since)
+    if until:
+        queryset = queryset.filter(pub_date__lt=until)
+    return queryset
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Кортежи колонок COLUMNS порциями по первичному ключу.
+
+    Каждая порция — отдельный короткий запрос pk > последний, так что
+    память не растёт с размером таблицы и не держится долгий курсор.
+    """
+    queryset = queryset.order_by('pk').values_list(
+        *(lookup for _, lookup in COLUMNS)
+    )
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][0]
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def serialize(rows, file_format):
+    names = [name for name, _ in COLUMNS]
+    if file_format == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(names)
+        for row in rows:
+            yield writer.writerow(row)
+        return
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + '\n'
+
+
+def gzipped(chunks, buffer_size=64 * 1024):
+    """Сжимает поток строк в gzip на лету, отдавая блоки байтов."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    pending = []
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode()
+        pending.append(data)
+        size += len(data)
+        if size >= buffer_size:
+            block = compressor.compress(b''.join(pending))
+            pending, size = [], 0
+            if block:
+                yield block
+    yield compressor.compress(b''.join(pending)) + compressor.flush()
+
+
+def export_stream(queryset, file_format, gzip=False):
+    if file_format not in FORMATS:
+        raise ExportError(
+            'Формат должен быть одним из: {}'.format(', '.join(FORMATS))
+        )
+    chunks = serialize(iter_rows(queryset), file_format)
+    return gzipped(chunks) if gzip else chunks
+
+
+def content_type(file_format, gzip=False):
+    return 'application/gzip' if gzip else CONTENT_TYPES[file_format]
+
+
+def file_name(file_format, gzip=False):
+    return f'posts.{file_format}' + ('.gz' if gzip else '')
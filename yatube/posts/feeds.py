@@ -0,0 +1,129 @@
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.text import Truncator
+
+from .cache import cache_shared_page, conditional_page, tag_page
+from .models import EXCERPT_LENGTH, Group, Post, User
+from .views import group_tags, index_tags, profile_tags
+
+FEED_TYPES = {
+    'rss': Rss201rev2Feed,
+    'atom': Atom1Feed,
+}
+TITLE_LENGTH = 50
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: последние записи'
+
+    def __init__(self, feed_format):
+        if feed_format not in FEED_TYPES:
+            raise Http404('Неизвестный формат ленты')
+        self.feed_type = FEED_TYPES[feed_format]
+
+    def description(self, obj):
+        return 'Последние записи всех авторов'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return self.posts(obj).select_related('author', 'group')[
+            :settings.FEED_ITEMS
+        ]
+
+    def item_title(self, post):
+        return Truncator(post.text).chars(TITLE_LENGTH)
+
+    def item_description(self, post):
+        return post.excerpt or Truncator(post.text).chars(EXCERPT_LENGTH)
+
+    def item_link(self, post):
+        return reverse('posts:post_detail', args=(post.pk,))
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.modified
+
+    def item_categories(self, post):
+        return (post.group.title,) if post.group else ()
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        group = get_object_or_404(Group, slug=slug)
+        tag_page(request, f'group:{group.pk}')
+        return group
+
+    def title(self, group):
+        return f'Yatube: {group.title}'
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_list', args=(group.slug,))
+
+    def posts(self, group):
+        return group.posts.all()
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        author = get_object_or_404(User, username=username)
+        tag_page(request, f'author:{author.pk}')
+        return author
+
+    def title(self, author):
+        return f'Yatube: {author.get_full_name() or author.username}'
+
+    def description(self, author):
+        return f'Записи пользователя {author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', args=(author.username,))
+
+    def posts(self, author):
+        return author.posts.all()
+
+
+def render_feed(feed, request, **kwargs):
+    response = feed(request, **kwargs)
+    # Last-Modified выставит conditional_page по отметкам сброса тегов.
+    del response['Last-Modified']
+    return response
+
+
+@conditional_page(index_tags)
+@cache_shared_page('feed:index')
+def index_feed(request, feed_format):
+    return render_feed(LatestPostsFeed(feed_format), request)
+
+
+@conditional_page(group_tags)
+@cache_shared_page()
+def group_feed(request, feed_format, slug):
+    return render_feed(GroupPostsFeed(feed_format), request, slug=slug)
+
+
+@conditional_page(profile_tags)
+@cache_shared_page()
+def profile_feed(request, feed_format, username):
+    return render_feed(
+        AuthorPostsFeed(feed_format), request, username=username
+    )
@@ -15,3 +15,14 @@ class PostForm(forms.ModelForm):
             'text': 'Текст нового поста',
             'group': 'Группа, к которой будет относиться пост'
         }
+
+
+class PostImageForm(forms.ModelForm):
+    """Картинка поста; отдельно от PostForm, чтобы та сохранила поля."""
+
+    class Meta:
+        model = Post
+        fields = ('image',)
+        labels = {
+            'image': 'Картинка',
+        }
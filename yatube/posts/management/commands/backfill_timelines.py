@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.models import Follow, TimelineEntry, User
+from posts.timeline import backfill, refresh_pulled
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает плодовитых авторов и собирает ленты подписок '
+            'заново: после импорта постов или смены TIMELINE_SIZE')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Чьи ленты собрать; по умолчанию — все.'
+        )
+        parser.add_argument('--size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        revived = refresh_pulled()
+        if revived:
+            self.stdout.write(
+                f'Снова рассылают посты авторов: {len(revived)}'
+            )
+        if options['usernames']:
+            user_ids = list(User.objects.filter(
+                username__in=options['usernames']
+            ).values_list('pk', flat=True))
+            if len(user_ids) != len(set(options['usernames'])):
+                raise CommandError('Некоторые пользователи не найдены')
+        else:
+            user_ids = sorted(
+                set(Follow.objects.values_list('user_id', flat=True))
+                | set(TimelineEntry.objects.values_list(
+                    'user_id', flat=True
+                ).distinct())
+            )
+        entries = 0
+        for number, user_id in enumerate(user_ids, 1):
+            entries += backfill(user_id, options['size'])
+            if number % 1000 == 0:
+                self.stdout.write(f'Лент: {number}, записей: {entries}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Собрано лент: {len(user_ids)}, записей: {entries}'
+        ))
@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from posts.benchmarks import bench_database, seed_posts, timed
+from posts.models import Group, Post, User
+
+# Сессии в БД и пользователь из БД на каждый запрос, как в Django по
+# умолчанию, против core.sessions и core.auth.
+PROFILES = {
+    'db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': [
+            'django.contrib.auth.backends.ModelBackend'
+        ],
+    },
+    'cached': {
+        'SESSION_ENGINE': settings.SESSION_ENGINE,
+        'AUTHENTICATION_BACKENDS': settings.AUTHENTICATION_BACKENDS,
+    },
+}
+# Чтение сессии и пользователя запроса; JOIN к auth_user в лентах
+# сюда не попадают.
+AUTH_QUERIES = (
+    'FROM "django_session"',
+    'FROM "{0}" WHERE "{0}"."id" ='.format(User._meta.db_table),
+)
+
+
+class Command(BaseCommand):
+    help = ('SQL-запросы и задержка страниц для вошедшего пользователя: '
+            'сессия и пользователь из БД и из кеша')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with bench_database():
+            author_ids, _ = seed_posts(options['posts'])
+            author = User.objects.get(pk=author_ids[0])
+            pages = (
+                ('index', reverse('posts:index')),
+                ('group_posts', reverse(
+                    'posts:group_list', args=(Group.objects.first().slug,)
+                )),
+                ('profile', reverse(
+                    'posts:profile', args=(author.username,)
+                )),
+                ('post_detail', reverse(
+                    'posts:post_detail', args=(Post.objects.first().pk,)
+                )),
+                ('follow_index', reverse('posts:follow_index')),
+                ('about', reverse('about:author')),
+            )
+            self.stdout.write(
+                f'{"страница":>12} {"профиль":>8} {"SQL":>4} '
+                f'{"сессия+user":>11} {"p50, мс":>8}'
+            )
+            for view, url in pages:
+                for name, overrides in PROFILES.items():
+                    with override_settings(**overrides):
+                        self.run(view, name, url, author, options['repeat'])
+
+    def run(self, view, name, url, user, repeat):
+        cache.clear()
+        client = Client()
+        client.force_login(user)
+        client.get(url)
+        auth_queries = []
+
+        def count_auth(execute, sql, params, many, context):
+            if any(query in sql for query in AUTH_QUERIES):
+                auth_queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_auth):
+            response = client.get(url)
+        queries = response.wsgi_request.metrics.queries
+        latency = timed(lambda: client.get(url), repeat)
+        self.stdout.write(
+            f'{view:>12} {name:>8} {queries:>4} '
+            f'{len(auth_queries):>11} {latency:>8.2f}'
+        )
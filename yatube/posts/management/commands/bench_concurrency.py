@@ -0,0 +1,109 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import override_settings
+
+from core.sqlite import write_with_retry
+from posts.benchmarks import bench_database, run_concurrent, seed_posts
+from posts.models import Post
+
+# Настройки SQLite до и после core.sqlite: журнал отката без прагм,
+# соединение на каждый запрос и запись без повторов.
+PROFILES = {
+    'default': {
+        'pragmas': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+        'conn_max_age': 0,
+        'retry': False,
+    },
+    'tuned': {
+        'pragmas': settings.SQLITE_PRAGMAS,
+        'conn_max_age': 60,
+        'retry': True,
+    },
+}
+
+
+class Command(BaseCommand):
+    help = ('Многопоточная нагрузка чтение/запись на файл SQLite '
+            'с настройками Django по умолчанию и с core.sqlite')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--write-ratio', type=float, default=0.1)
+        parser.add_argument(
+            '--profiles', nargs='+', choices=PROFILES,
+            default=list(PROFILES),
+        )
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp()
+        file_name = os.path.join(directory, 'bench.sqlite3')
+        try:
+            with bench_database(file_name=file_name):
+                self.author_ids, _ = seed_posts(options['posts'])
+                self.stdout.write(
+                    f'{Post.objects.count()} постов, '
+                    f'{options["threads"]} потоков, '
+                    f'доля записей {options["write_ratio"]:.0%}'
+                )
+                self.stdout.write(
+                    f'{"профиль":>8} {"оп/с":>8} {"чтений":>8} '
+                    f'{"записей":>8} {"ошибок":>7} {"p50, мс":>8} '
+                    f'{"p99, мс":>8}'
+                )
+                for name in options['profiles']:
+                    self.run(name, PROFILES[name], options)
+        finally:
+            for suffix in ('', '-wal', '-shm', '-journal'):
+                if os.path.exists(file_name + suffix):
+                    os.remove(file_name + suffix)
+            os.rmdir(directory)
+
+    def run(self, name, profile, options):
+        author_ids = self.author_ids
+        last_pk = Post.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first()
+        queryset = Post.objects.select_related('author', 'group')
+
+        def read(rng):
+            list(queryset[:10])
+            queryset.filter(pk=rng.randint(1, last_pk)).first()
+
+        def create(rng):
+            Post.objects.create(
+                text='Пост из бенчмарка', author_id=rng.choice(author_ids)
+            )
+
+        def write(rng):
+            if profile['retry']:
+                write_with_retry(create, rng)
+            else:
+                with transaction.atomic():
+                    create(rng)
+
+        database = connections.databases[DEFAULT_DB_ALIAS]
+        old_max_age = database['CONN_MAX_AGE']
+        connections.close_all()
+        database['CONN_MAX_AGE'] = profile['conn_max_age']
+        try:
+            with override_settings(SQLITE_PRAGMAS=profile['pragmas']):
+                connections[DEFAULT_DB_ALIAS].ensure_connection()
+                result = run_concurrent(
+                    read, write, options['threads'], options['seconds'],
+                    options['write_ratio'],
+                )
+        finally:
+            connections.close_all()
+            database['CONN_MAX_AGE'] = old_max_age
+        latency = result['latency_ms'] or {'p50': 0, 'p99': 0}
+        self.stdout.write(
+            f'{name:>8} {result["ops_per_s"]:>8.0f} {result["reads"]:>8} '
+            f'{result["writes"]:>8} {result["errors"]:>7} '
+            f'{latency["p50"]:>8.2f} {latency["p99"]:>8.2f}'
+        )
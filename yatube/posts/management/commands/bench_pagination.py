@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+
+from posts.benchmarks import bench_database, seed_posts, timed
+from posts.models import Post
+from posts.utils import FORWARD, CursorPaginator, encode_cursor
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает offset- и keyset-пагинацию ленты на глубоких страницах'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--depths', type=float, nargs='+', default=[0, 0.1, 0.5, 0.99],
+            help='Глубина страницы как доля ленты.'
+        )
+        parser.add_argument('--keepdb', action='store_true')
+
+    def handle(self, *args, **options):
+        with bench_database(keepdb=options['keepdb']):
+            if not Post.objects.exists():
+                seed_posts(options['posts'])
+            self.run(options['depths'], options['repeat'])
+
+    def run(self, depths, repeat):
+        per_page = settings.POSTS_IN_PAGE
+        queryset = Post.objects.select_related('author', 'group')
+        total = queryset.count()
+        self.stdout.write(f'{total} постов, {per_page} на странице')
+        self.stdout.write(f'{"страница":>10} {"offset, мс":>12} '
+                          f'{"keyset, мс":>12}')
+        for depth in depths:
+            number = max(1, int(total * depth) // per_page)
+            offset = (number - 1) * per_page
+            paginator = CursorPaginator(queryset, per_page)
+            cursor = None
+            if offset:
+                anchor = paginator.object_list[offset - 1]
+                cursor = encode_cursor(FORWARD, anchor)
+            offset_ms = timed(
+                lambda: list(Paginator(
+                    queryset.order_by(*CursorPaginator.ordering), per_page
+                ).page(number)),
+                repeat,
+            )
+            keyset_ms = timed(
+                lambda: list(CursorPaginator(
+                    queryset, per_page
+                ).get_cursor_page(cursor)),
+                repeat,
+            )
+            self.stdout.write(f'{number:>10} {offset_ms:>12.2f} '
+                              f'{keyset_ms:>12.2f}')
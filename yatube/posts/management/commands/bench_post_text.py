@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.template import engines
+
+from posts.benchmarks import timed
+from posts.models import Post
+
+TEMPLATES = {
+    'фильтры': (
+        '{{ post.text|linebreaks }}{{ post.text|linebreaksbr }}'
+    ),
+    'готовый HTML': (
+        '{{ post.text_html|safe }}{{ post.text_br_html|safe }}'
+    ),
+}
+PARAGRAPH = ('Строка текста поста со <b>спецсимволами</b> & "кавычками",'
+             ' которые нужно экранировать.\n') * 3 + '\n'
+
+
+class Command(BaseCommand):
+    help = ('Время вывода текста поста на страницу поста и в карточку: '
+            'фильтры на каждый показ против готового HTML')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lengths', type=int, nargs='+', default=[200, 2000, 20000],
+            help='Длины текста в символах.'
+        )
+        parser.add_argument('--repeat', type=int, default=500)
+
+    def handle(self, *args, **options):
+        engine = engines.all()[0]
+        templates = {
+            name: engine.from_string(code)
+            for name, code in TEMPLATES.items()
+        }
+        self.stdout.write(f'{"символов":>9} ' + ' '.join(
+            f'{name + ", мкс":>18}' for name in templates
+        ) + f' {"ускорение":>10}')
+        for length in options['lengths']:
+            post = Post(text=(PARAGRAPH * (length // len(PARAGRAPH) + 1))[
+                :length
+            ])
+            post.render_text()
+            context = {'post': post}
+            times = [
+                timed(lambda: template.render(context),
+                      options['repeat']) * 1000
+                for template in templates.values()
+            ]
+            self.stdout.write(
+                f'{length:>9} '
+                + ' '.join(f'{value:>18.1f}' for value in times)
+                + f' {times[0] / times[1]:>9.1f}x'
+            )
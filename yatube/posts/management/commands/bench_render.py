@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from posts.benchmarks import (bench_database, render_cards_one_by_one,
+                              seed_posts, template_settings, timed)
+from posts.models import Post
+from posts.templatetags.post_cards import render_cards
+
+
+class Command(BaseCommand):
+    help = ('Время рендера одной карточки поста: по одной через загрузчик '
+            'и reverse() и пакетом через render_cards, с кешем шаблонов '
+            'и без')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cards', type=int, default=settings.POSTS_IN_PAGE,
+            help='Карточек на странице.'
+        )
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with bench_database():
+            seed_posts(options['cards'])
+            posts = list(Post.objects.select_related('author', 'group')[
+                :options['cards']
+            ])
+            self.stdout.write(
+                f'{"загрузчик":>10} {"путь":>14} {"мкс на карточку":>16}'
+            )
+            for cached in (False, True):
+                with override_settings(TEMPLATES=template_settings(cached)):
+                    for name, render in (
+                        ('по одной', render_cards_one_by_one),
+                        ('render_cards', render_cards),
+                    ):
+                        render(posts)
+                        per_card = timed(
+                            lambda: render(posts), options['repeat']
+                        ) * 1000 / len(posts)
+                        self.stdout.write(
+                            f'{"cached" if cached else "файлы":>10} '
+                            f'{name:>14} {per_card:>16.1f}'
+                        )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from posts.benchmarks import bench_database, seed_posts, timed
+from posts.models import Post
+from posts.search import matching_posts, search_page
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает поиск через FTS5 с поиском через LIKE'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--queries', nargs='+',
+            default=['кошка', 'поезд музыка', 'тег4217', 'горы тег17'],
+        )
+        parser.add_argument('--keepdb', action='store_true')
+
+    def handle(self, *args, **options):
+        with bench_database(keepdb=options['keepdb']):
+            if not Post.objects.exists():
+                seed_posts(options['posts'])
+            self.run(options['queries'], options['repeat'])
+
+    def run(self, queries, repeat):
+        queryset = Post.objects.select_related('author', 'group')
+        self.stdout.write(f'{Post.objects.count()} постов')
+        self.stdout.write(f'{"запрос":>22} {"LIKE, мс":>10} {"FTS5, мс":>10} '
+                          f'{"LIKE count":>11} {"FTS5 count":>11}')
+        for query in queries:
+            like = queryset
+            for word in query.split():
+                like = like.filter(text__icontains=word)
+            fts = matching_posts(queryset, query)
+            self.stdout.write(
+                f'{query:>22} '
+                f'{timed(lambda: list(like[:10]), repeat):>10.2f} '
+                f'{timed(lambda: list(search_page(query)), repeat):>10.2f} '
+                f'{timed(like.count, repeat):>11.2f} '
+                f'{timed(fts.count, repeat):>11.2f}'
+            )
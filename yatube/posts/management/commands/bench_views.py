@@ -0,0 +1,86 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import override_settings
+
+from core.buffers import BufferedCounter
+from posts.benchmarks import bench_database, run_concurrent, seed_posts
+from posts.models import Post, PostPopularity
+from posts.popular import write_views
+
+
+class Command(BaseCommand):
+    help = ('Многопоточные показы постов со счётчиком просмотров: UPDATE '
+            'на каждый показ и буфер posts.popular')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--flush-size', type=int, default=100)
+        parser.add_argument('--flush-seconds', type=float, default=10)
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp()
+        file_name = os.path.join(directory, 'bench.sqlite3')
+        try:
+            with bench_database(file_name=file_name):
+                seed_posts(options['posts'])
+                self.stdout.write(
+                    f'{Post.objects.count()} постов, '
+                    f'{options["threads"]} потоков'
+                )
+                self.stdout.write(
+                    f'{"счётчик":>9} {"показов/с":>10} {"ошибок":>7} '
+                    f'{"записей":>8} {"p50, мс":>8} {"p99, мс":>8} '
+                    f'{"в базе":>8}'
+                )
+                with override_settings(
+                    VIEW_COUNTER_FLUSH_SIZE=options['flush_size'],
+                    VIEW_COUNTER_FLUSH_SECONDS=options['flush_seconds'],
+                ):
+                    for name in ('per-hit', 'buffered'):
+                        self.run(name, options)
+        finally:
+            for suffix in ('', '-wal', '-shm', '-journal'):
+                if os.path.exists(file_name + suffix):
+                    os.remove(file_name + suffix)
+            os.rmdir(directory)
+
+    def run(self, name, options):
+        PostPopularity.objects.all().delete()
+        last_pk = Post.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first()
+        flushes = []
+
+        def write(deltas):
+            write_views(deltas)
+            flushes.append(len(deltas))
+
+        counter = BufferedCounter(
+            write, 'VIEW_COUNTER_FLUSH_SECONDS', 'VIEW_COUNTER_FLUSH_SIZE'
+        )
+
+        def show(rng):
+            post_id = rng.randint(1, last_pk)
+            Post.objects.filter(pk=post_id).first()
+            if name == 'per-hit':
+                write({post_id: 1})
+            else:
+                counter.incr(post_id)
+
+        connections.close_all()
+        result = run_concurrent(
+            show, show, options['threads'], options['seconds'], 0
+        )
+        counter.flush()
+        latency = result['latency_ms'] or {'p50': 0, 'p99': 0}
+        stored = sum(PostPopularity.objects.values_list('views', flat=True))
+        self.stdout.write(
+            f'{name:>9} {result["ops_per_s"]:>10.0f} '
+            f'{result["errors"]:>7} {len(flushes):>8} '
+            f'{latency["p50"]:>8.2f} {latency["p99"]:>8.2f} {stored:>8}'
+        )
@@ -0,0 +1,125 @@
+import json
+import platform
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from posts.benchmarks import (bench_database, run_view_benchmarks,
+                              seed_posts, view_targets)
+from posts.models import Group, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет отдельную БД синтетическими данными и замеряет '
+        'представления posts: перцентили задержки, SQL и рендер'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts-per-author', type=int, default=100)
+        parser.add_argument(
+            '--skew', type=float, default=1.0,
+            help='Показатель Ципфа для авторов и групп, 0 — равномерно.'
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--anonymous', action='store_true',
+            help='Ленты и пост запрашивать без авторизации.'
+        )
+        parser.add_argument(
+            '--output', help='Файл для результатов в формате JSON.'
+        )
+        parser.add_argument('--keepdb', action='store_true')
+
+    def handle(self, *args, **options):
+        with bench_database(keepdb=options['keepdb']):
+            started = time.perf_counter()
+            author_ids, group_ids = seed_posts(
+                options['users'] * options['posts_per_author'],
+                authors=options['users'],
+                groups=options['groups'],
+                skew=options['skew'],
+            )
+            seed_seconds = time.perf_counter() - started
+            results = self.run(author_ids, group_ids, options)
+        report = {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'revision': self.revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'params': {
+                name: options[name] for name in (
+                    'users', 'groups', 'posts_per_author', 'skew',
+                    'repeat', 'warmup', 'anonymous',
+                )
+            },
+            'seed_seconds': seed_seconds,
+            'results': results,
+        }
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
+
+    def run(self, author_ids, group_ids, options):
+        author = User.objects.get(pk=author_ids[0])
+        group = Group.objects.get(pk=group_ids[0])
+        posts = author.posts.all()
+        post = posts[posts.count() // 2]
+        client = Client()
+        author_client = Client()
+        author_client.force_login(author)
+        targets = view_targets(author, group, post, settings.POSTS_IN_PAGE)
+        results = []
+        for target in targets:
+            feed = target['method'] == 'get' and target['view'] in (
+                'index', 'group_posts', 'profile', 'post_detail'
+            )
+            results += run_view_benchmarks(
+                [target],
+                client if feed and options['anonymous'] else author_client,
+                repeat=options['repeat'],
+                warmup=options['warmup'],
+            )
+        return results
+
+    def revision(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True,
+                cwd=settings.BASE_DIR,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def print_report(self, report):
+        self.stdout.write(
+            'Данные: {users} авторов, {groups} групп, '
+            '{posts_per_author} постов на автора, skew {skew}'.format(
+                **report['params']
+            )
+        )
+        self.stdout.write(f'Наполнение: {report["seed_seconds"]:.1f} с')
+        self.stdout.write(
+            f'{"представление":<22} {"стр.":<7}{"p50":>8}{"p90":>8}'
+            f'{"p99":>8}{"рендер":>9}{"SQL":>5}'
+        )
+        for result in report['results']:
+            latency = result['latency_ms']
+            render = result['render_ms']
+            self.stdout.write(
+                f'{result["view"] + " " + result["method"]:<22} '
+                f'{result["page"] or "":<7}'
+                f'{latency["p50"]:>8.2f}{latency["p90"]:>8.2f}'
+                f'{latency["p99"]:>8.2f}'
+                f'{render["p50"] if render else 0:>9.2f}'
+                f'{result["queries"]:>5}'
+            )
@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import FORMATS, ExportError, export_queryset, export_stream
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты с автором и группой в CSV или JSONL порциями, '
+        'не загружая таблицу в память'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--group', help='Slug группы.')
+        parser.add_argument('--author', help='Username автора.')
+        parser.add_argument(
+            '--since', help='Дата публикации от (включительно).'
+        )
+        parser.add_argument('--until', help='Дата публикации до.')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument(
+            '--output', '-o', help='Файл; по умолчанию stdout.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            queryset = export_queryset(
+                group=options['group'],
+                author=options['author'],
+                since=options['since'],
+                until=options['until'],
+            )
+            stream = export_stream(
+                queryset, options['format'], options['gzip']
+            )
+        except ExportError as error:
+            raise CommandError(error)
+        if options['output']:
+            mode = 'wb' if options['gzip'] else 'w'
+            encoding = None if options['gzip'] else 'utf-8'
+            with open(options['output'], mode, encoding=encoding,
+                      newline=None if options['gzip'] else '') as output:
+                output.writelines(stream)
+        elif options['gzip']:
+            sys.stdout.buffer.writelines(stream)
+        else:
+            for chunk in stream:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,91 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.bulk_import import (DEFAULT_BATCH_SIZE, FORMATS, import_posts,
+                               read_records)
+from posts.models import ImportCheckpoint
+
+MAX_REPORTED_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSONL или CSV (поля text, author, group, '
+        'pub_date) партиями bulk_create с возможностью продолжить после сбоя'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='По умолчанию определяется по расширению файла.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Создавать отсутствующих авторов и группы.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Имя контрольной точки, по умолчанию — полный путь к файлу.'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать импорт с начала файла, забыв контрольную точку.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1][1:]
+        if file_format not in FORMATS:
+            raise CommandError(
+                'Не удалось определить формат, укажите --format'
+            )
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(
+            name=options['checkpoint'] or os.path.abspath(path)
+        )
+        if options['restart']:
+            checkpoint.rows = 0
+            checkpoint.save()
+        if checkpoint.rows:
+            self.stdout.write(
+                f'Продолжаем со строки {checkpoint.rows + 1}'
+            )
+        self.errors = 0
+        progress = None
+        with open(path, encoding='utf-8', newline='') as stream:
+            for progress in import_posts(
+                read_records(stream, file_format),
+                checkpoint,
+                batch_size=options['batch_size'],
+                create_missing=options['create_missing'],
+                on_error=self.report_error,
+            ):
+                self.stdout.write(
+                    f'Строк: {progress.rows}, импортировано: '
+                    f'{progress.imported}, '
+                    f'{self.rate(progress):.0f} строк/с'
+                )
+        if progress is None:
+            self.stdout.write('Новых строк нет')
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: импортировано {progress.imported}, пропущено '
+            f'{progress.skipped} за {progress.seconds:.1f} с '
+            f'({self.rate(progress):.0f} строк/с)'
+        ))
+
+    def rate(self, progress):
+        return progress.imported / progress.seconds if progress.seconds else 0
+
+    def report_error(self, number, error):
+        self.errors += 1
+        if self.errors <= MAX_REPORTED_ERRORS:
+            self.stderr.write(f'Строка {number}: {error}')
+        elif self.errors == MAX_REPORTED_ERRORS + 1:
+            self.stderr.write('Дальнейшие ошибки не выводятся')
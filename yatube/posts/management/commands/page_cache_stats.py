@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.cache import page_cache_stats, reset_page_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает статистику кеша страниц для анонимных пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true')
+
+    def handle(self, *args, **options):
+        stats = page_cache_stats()
+        self.stdout.write(
+            'попаданий: {hits}, промахов: {misses}, '
+            'доля попаданий: {hit_ratio:.1%}, '
+            'инвалидаций: {invalidations}'.format(**stats)
+        )
+        if options['reset']:
+            reset_page_cache_stats()
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.counters import find_mismatches, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов авторов и групп'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только проверить счётчики, ничего не меняя.'
+        )
+
+    def handle(self, *args, **options):
+        mismatches = find_mismatches()
+        for obj, counted, actual in mismatches:
+            self.stdout.write(
+                f'{obj._meta.verbose_name} {obj}: '
+                f'в счётчике {counted}, постов {actual}'
+            )
+        if options['check']:
+            if mismatches:
+                raise CommandError(f'Расхождений: {len(mismatches)}')
+            self.stdout.write(self.style.SUCCESS('Счётчики в порядке'))
+            return
+        rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики пересчитаны, исправлено: {len(mismatches)}'
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.search import install_search_index, search_available
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовый индекс постов (SQLite FTS5)'
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite')
+        install_search_index(rebuild=True)
+        self.stdout.write(self.style.SUCCESS('Индекс пересобран'))
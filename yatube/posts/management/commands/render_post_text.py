@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import RENDERED_FIELDS, Post
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = ('Заполняет готовый HTML и выдержку текста у постов, '
+            'сохранённых до их появления')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать все посты, например после смены фильтров.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.order_by('pk').only('pk', 'text')
+        if not options['all']:
+            queryset = queryset.filter(text_html='').exclude(text='')
+        last_pk = total = 0
+        while True:
+            posts = list(
+                queryset.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not posts:
+                break
+            for post in posts:
+                post.render_text()
+            with transaction.atomic():
+                Post.objects.bulk_update(posts, RENDERED_FIELDS)
+            last_pk = posts[-1].pk
+            total += len(posts)
+            self.stdout.write(f'Обработано постов: {total}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово, обновлено постов: {total}'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.timeline import oversized_timelines, trim
+
+
+class Command(BaseCommand):
+    help = ('Обрезает ленты подписок до TIMELINE_SIZE последних записей; '
+            'более старые посты лента дочитывает напрямую')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        users = deleted = 0
+        for user_id in list(oversized_timelines(options['size'])):
+            deleted += trim(user_id, options['size'])
+            users += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обрезано лент: {users}, удалено записей: {deleted}'
+        ))
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_follow_timeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, help_text='Начало текста для RSS и Atom', max_length=300, verbose_name='Выдержка'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_br_html',
+            field=models.TextField(blank=True, editable=False, help_text='Строки через <br> для карточек лент', verbose_name='Текст в HTML для карточки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, help_text='Абзацы для страницы поста, готовятся при сохранении', verbose_name='Текст в HTML'),
+        ),
+    ]
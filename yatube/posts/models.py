@@ -1,9 +1,26 @@
 from django.contrib.auth import get_user_model
-from django.db import models
-
+from django.db import models, transaction
+from django.template.defaultfilters import linebreaks_filter, linebreaksbr
+from django.utils.text import Truncator
 
 User = get_user_model()
 
+EXCERPT_LENGTH = 300
+RENDERED_FIELDS = ('text_html', 'text_br_html', 'excerpt')
+
+
+def render_text(text):
+    """HTML-варианты и выдержка текста поста для RENDERED_FIELDS.
+
+    Те же фильтры, что раньше применялись в шаблонах на каждый показ:
+    linebreaks для страницы поста, linebreaksbr для карточки.
+    """
+    return {
+        'text_html': linebreaks_filter(text, autoescape=True),
+        'text_br_html': linebreaksbr(text, autoescape=True),
+        'excerpt': Truncator(text).chars(EXCERPT_LENGTH),
+    }
+
 
 class Group(models.Model):
     title = models.CharField(
@@ -19,6 +36,11 @@ class Group(models.Model):
         verbose_name='Описание группы',
         help_text='Введите описание группы'
     )
+    post_count = models.PositiveIntegerField(
+        verbose_name='Количество постов',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Группа'
@@ -37,6 +59,10 @@ class Post(models.Model):
         verbose_name='Дата',
         auto_now_add=True
     )
+    modified = models.DateTimeField(
+        verbose_name='Изменён',
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -52,9 +78,261 @@ class Post(models.Model):
         verbose_name='Группа',
         help_text='Выберите группу',
     )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+    thumbnails = models.TextField(
+        verbose_name='Миниатюры',
+        blank=True,
+        editable=False,
+        help_text='JSON с адресами готовых миниатюр картинки'
+    )
+    text_html = models.TextField(
+        verbose_name='Текст в HTML',
+        blank=True,
+        editable=False,
+        help_text='Абзацы для страницы поста, готовятся при сохранении'
+    )
+    text_br_html = models.TextField(
+        verbose_name='Текст в HTML для карточки',
+        blank=True,
+        editable=False,
+        help_text='Строки через <br> для карточек лент'
+    )
+    excerpt = models.CharField(
+        verbose_name='Выдержка',
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False,
+        help_text='Начало текста для RSS и Atom'
+    )
 
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_feed_idx',
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {'author_id', 'group_id'} <= set(field_names):
+            instance.remember_saved_state()
+        return instance
+
+    def remember_saved_state(self):
+        """Запоминает сохранённых в БД автора и группу поста."""
+        self._saved_state = (self.author_id, self.group_id)
+
+    def render_text(self):
+        for field, value in render_text(self.text).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.render_text()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *RENDERED_FIELDS}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_stats',
+        verbose_name='Автор'
+    )
+    post_count = models.PositiveIntegerField(
+        verbose_name='Количество постов',
+        default=0,
+    )
+    pull_timeline = models.BooleanField(
+        verbose_name='Без рассылки в ленты',
+        default=False,
+        help_text='Посты слишком плодовитого автора не раскладываются '
+                  'по лентам подписчиков, а дочитываются при показе'
+    )
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.author_id}: {self.post_count}'
+
+    @staticmethod
+    def post_count_for(author):
+        stats = getattr(author, 'post_stats', None)
+        return stats.post_count if stats else 0
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+    created = models.DateTimeField(
+        verbose_name='Подписан',
+        auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = 'Подписка'
+        verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_follow',
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='no_self_follow',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user_id} → {self.author_id}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в готовой ленте подписок пользователя.
+
+    pub_date и author копируются из поста, чтобы лента читалась одним
+    проходом по индексу (user, pub_date, post) без соединения с постами.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата'
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Записи лент подписок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_timeline_post',
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='timeline_feed_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user_id}: {self.post_id}'
+
+
+class PostPopularity(models.Model):
+    """Просмотры поста и рейтинг популярности с затуханием.
+
+    score — натуральный логарифм суммы просмотров, каждый с весом
+    2 ** ((время просмотра - POPULAR_EPOCH) / POPULAR_HALF_LIFE). Веса
+    старых просмотров относительно новых со временем падают, а порядок по
+    score совпадает с порядком по затухающему счёту в любой момент, так
+    что рейтинг обновляется только прибавлением и читается по индексу.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='popularity',
+        verbose_name='Пост'
+    )
+    views = models.PositiveIntegerField(
+        verbose_name='Просмотры',
+        default=0,
+    )
+    score = models.FloatField(
+        verbose_name='Рейтинг',
+        default=0,
+        db_index=True,
+    )
+    updated = models.DateTimeField(
+        verbose_name='Обновлён',
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = 'Популярность поста'
+        verbose_name_plural = 'Популярность постов'
+
+    def __str__(self):
+        return f'{self.post_id}: {self.views}'
+
+    @staticmethod
+    def views_for(post):
+        popularity = getattr(post, 'popularity', None)
+        return popularity.views if popularity else 0
+
+
+class ImportCheckpoint(models.Model):
+    name = models.CharField(
+        verbose_name='Источник',
+        max_length=255,
+        unique=True
+    )
+    rows = models.BigIntegerField(
+        verbose_name='Обработано строк',
+        default=0,
+    )
+    updated = models.DateTimeField(
+        verbose_name='Обновлён',
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = 'Контрольная точка импорта'
+        verbose_name_plural = 'Контрольные точки импорта'
+
+    def __str__(self):
+        return f'{self.name}: {self.rows}'
@@ -0,0 +1,83 @@
+import math
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from core.buffers import BufferedCounter
+from core.sqlite import write_with_retry
+
+from .cache import invalidate_tags
+from .models import Post, PostPopularity
+from .utils import windowed_paginator_obj
+
+POPULARITY = PostPopularity._meta.db_table
+POST = Post._meta.db_table
+# Прибавляет просмотры и складывает рейтинги в логарифмах:
+# ln(e^a + e^b) = m + ln(e^(a - m) + e^(b - m)), m = max(a, b). Строки
+# удалённых постов отсекает SELECT по posts_post.
+UPSERT_SQL = (
+    f'INSERT INTO {POPULARITY} (post_id, views, score, updated) '
+    f'SELECT id, %s, %s, %s FROM {POST} WHERE id = %s '
+    f'ON CONFLICT (post_id) DO UPDATE SET '
+    f'views = views + excluded.views, '
+    f'score = MAX(score, excluded.score) + LN('
+    f'EXP(score - MAX(score, excluded.score)) + '
+    f'EXP(excluded.score - MAX(score, excluded.score))), '
+    f'updated = excluded.updated'
+)
+
+
+def view_score(views, when):
+    """Логарифм веса views просмотров, сделанных в момент when."""
+    age = (when - settings.POPULAR_EPOCH).total_seconds()
+    return math.log(views) + math.log(2) * age / settings.POPULAR_HALF_LIFE
+
+
+def write_views(deltas, now=None):
+    """Прибавляет просмотры {post_id: число} одним executemany."""
+    now = now or timezone.now()
+    updated = connection.ops.adapt_datetimefield_value(now)
+    rows = [
+        (views, view_score(views, now), updated, post_id)
+        for post_id, views in deltas.items()
+    ]
+
+    def upsert():
+        with connection.cursor() as cursor:
+            cursor.executemany(UPSERT_SQL, rows)
+    write_with_retry(upsert)
+    invalidate_tags('feed:popular')
+
+
+view_counter = BufferedCounter(
+    write_views, 'VIEW_COUNTER_FLUSH_SECONDS', 'VIEW_COUNTER_FLUSH_SIZE'
+)
+
+
+def count_views(view):
+    """Считает показы поста, в том числе отданные из кеша и 304."""
+    @wraps(view)
+    def wrapper(request, post_id, *args, **kwargs):
+        response = view(request, post_id, *args, **kwargs)
+        if request.method == 'GET' and response.status_code in (200, 304):
+            view_counter.incr(post_id)
+        return response
+    return wrapper
+
+
+def popular_posts():
+    # Ничья — по post_id рейтинга: весь порядок даёт индекс score. Через
+    # F, иначе ссылка на связь развернулась бы в Post.Meta.ordering.
+    return Post.objects.filter(popularity__isnull=False).select_related(
+        'author', 'group'
+    ).order_by('-popularity__score', F('popularity__post_id').desc())
+
+
+def popular_page(request):
+    """Страница рейтинга: первые POPULAR_POSTS постов по score."""
+    def count():
+        return min(PostPopularity.objects.count(), settings.POPULAR_POSTS)
+    return windowed_paginator_obj(request, popular_posts(), count)
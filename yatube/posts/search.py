@@ -0,0 +1,138 @@
+import re
+
+from django.conf import settings
+from django.db import connection, connections, router
+
+from .models import Post
+from .utils import (BACKWARD, FORWARD, CursorPage, CursorPaginator,
+                    decode_key, encode_key)
+
+FTS_TABLE = 'posts_post_fts'
+CREATE_TABLE_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    f"text, content='posts_post', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')"
+)
+TRIGGERS_SQL = (
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert '
+    f'AFTER INSERT ON posts_post BEGIN '
+    f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete '
+    f'AFTER DELETE ON posts_post BEGIN '
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); END",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update '
+    f'AFTER UPDATE OF text ON posts_post '
+    f'WHEN old.text IS NOT new.text BEGIN '
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END',
+)
+REBUILD_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+MATCH_SQL = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+RANKED_SQL = (
+    f'SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+)
+WORD_RE = re.compile(r'\w+')
+
+
+def search_available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install_search_index(using=connection, rebuild=False):
+    """Создаёт FTS5-таблицу и триггеры синхронизации, если их нет.
+
+    Пересоздание таблицы posts_post при миграциях SQLite удаляет
+    триггеры, поэтому функция вызывается и после каждого migrate.
+    """
+    if (not search_available(using)
+            or Post._meta.db_table not in using.introspection.table_names()):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(CREATE_TABLE_SQL)
+        for sql in TRIGGERS_SQL:
+            cursor.execute(sql)
+        if rebuild:
+            cursor.execute(REBUILD_SQL)
+
+
+def match_expression(query):
+    """Превращает ввод пользователя в MATCH-выражение: все слова сразу."""
+    return ' '.join(f'"{word}"' for word in WORD_RE.findall(query))
+
+
+def matching_posts(queryset, query):
+    match = match_expression(query)
+    if not match:
+        return queryset.none()
+    if not search_available():
+        return queryset.filter(text__icontains=query)
+    return queryset.extra(
+        where=[f'"posts_post"."id" IN ({MATCH_SQL})'], params=[match]
+    )
+
+
+def search_page(query, cursor=None, per_page=None):
+    """Страница результатов по релевантности (bm25) с курсорами."""
+    per_page = per_page or settings.POSTS_IN_PAGE
+    match = match_expression(query)
+    queryset = Post.objects.select_related('author', 'group')
+    if not match or not search_available():
+        paginator = CursorPaginator(
+            matching_posts(queryset, query), per_page
+        )
+        return paginator.get_cursor_page(cursor)
+    position = _decode_rank_cursor(cursor)
+    if position and position[0] == BACKWARD:
+        rows = _ranked(match, per_page, position[1:], backward=True)
+        if len(rows) > per_page:
+            rows = rows[:per_page][::-1]
+            return _build_page(queryset, rows, per_page, True, True)
+        # Дошли до начала выдачи: отдаём первую страницу.
+        position = None
+    rows = _ranked(match, per_page, position and position[1:])
+    return _build_page(
+        queryset, rows, per_page, bool(position), len(rows) > per_page
+    )
+
+
+def _decode_rank_cursor(cursor):
+    key = decode_key(cursor)
+    if key is None:
+        return None
+    direction, pk, rank = key
+    try:
+        return direction, pk, float(rank)
+    except ValueError:
+        return None
+
+
+def _ranked(match, per_page, after=None, backward=False):
+    sql, params = RANKED_SQL, [match]
+    if after:
+        pk, rank = after
+        sign = '<' if backward else '>'
+        sql += f' AND (rank {sign} %s OR (rank = %s AND rowid {sign} %s))'
+        params += [rank, rank, pk]
+    order = 'DESC' if backward else 'ASC'
+    sql += f' ORDER BY rank {order}, rowid {order} LIMIT %s'
+    params.append(per_page + 1)
+    using = router.db_for_read(Post)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _build_page(queryset, rows, per_page, has_previous, has_next):
+    rows = rows[:per_page]
+    posts = queryset.in_bulk([pk for pk, _ in rows])
+    next_cursor = previous_cursor = None
+    if rows and has_next:
+        next_cursor = encode_key(FORWARD, *rows[-1])
+    if rows and has_previous:
+        previous_cursor = encode_key(BACKWARD, *rows[0])
+    return CursorPage(
+        [posts[pk] for pk, _ in rows if pk in posts],
+        None, None, next_cursor, previous_cursor
+    )
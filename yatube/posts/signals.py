@@ -0,0 +1,70 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import invalidate_on_commit, post_tags
+from .counters import change_author_count, change_group_count
+from .models import Group, Post, TimelineEntry
+from .search import install_search_index
+from .thumbnails import schedule_thumbnails
+from .timeline import fan_out_post
+
+
+@receiver(pre_save, sender=Post)
+def load_saved_state(sender, instance, raw, **kwargs):
+    if raw or instance.pk is None or hasattr(instance, '_saved_state'):
+        return
+    instance._saved_state = Post.objects.filter(pk=instance.pk).values_list(
+        'author_id', 'group_id'
+    ).first() or (None, None)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    old_author_id, old_group_id = (
+        (None, None) if created else instance._saved_state
+    )
+    if old_author_id != instance.author_id:
+        if old_author_id is not None:
+            change_author_count(old_author_id, -1)
+        change_author_count(instance.author_id, 1)
+    if old_group_id != instance.group_id:
+        if old_group_id is not None:
+            change_group_count(old_group_id, -1)
+        if instance.group_id is not None:
+            change_group_count(instance.group_id, 1)
+    invalidate_on_commit(*post_tags(
+        instance.pk,
+        (old_author_id, old_group_id),
+        (instance.author_id, instance.group_id),
+    ))
+    instance.remember_saved_state()
+    schedule_thumbnails(instance)
+    if created:
+        fan_out_post.delay(instance.pk)
+    elif old_author_id != instance.author_id:
+        TimelineEntry.objects.filter(post=instance).delete()
+        fan_out_post.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    author_id, group_id = getattr(
+        instance, '_saved_state', (instance.author_id, instance.group_id)
+    )
+    change_author_count(author_id, -1)
+    if group_id is not None:
+        change_group_count(group_id, -1)
+    invalidate_on_commit(*post_tags(instance.pk, (author_id, group_id)))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    invalidate_on_commit('feed:index', f'group:{instance.pk}')
+
+
+def ensure_search_index(sender, using, **kwargs):
+    install_search_index(connections[using])
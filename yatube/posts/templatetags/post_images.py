@@ -0,0 +1,11 @@
+from django import template
+
+from ..thumbnails import image_context
+
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/post_image.html')
+def post_image(post, variant):
+    """<img> с готовыми миниатюрами из srcset и ленивой загрузкой."""
+    return image_context(post, variant)
@@ -0,0 +1,164 @@
+from unittest import mock
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core.testing import QueryBudgetMixin
+
+from .. import bulk
+from ..counters import rebuild as rebuild_counters
+from ..models import AuthorStats, Group, Post, TimelineEntry, User
+from ..timeline import follow
+
+CHANGELIST = reverse('admin:posts_post_changelist')
+
+
+class PostAdminTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.authors = [
+            User.objects.create_user(username=f'author-{number}')
+            for number in range(2)
+        ]
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {number}', slug=f'group-{number}',
+                description='',
+            )
+            for number in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def grow(self, size):
+        existing = Post.objects.count()
+        Post.objects.bulk_create(
+            Post(
+                text=f'Пост {number}',
+                author=self.authors[number % 2],
+                group=self.groups[number % 2],
+            )
+            for number in range(existing, size)
+        )
+        rebuild_counters()
+
+    def pks(self, response):
+        return [post.pk for post in response.context['cl'].result_list]
+
+    def test_keyset_pages(self):
+        """Страницы идут по курсору pk вперёд и назад без пропусков."""
+        self.grow(5)
+        pks = list(Post.objects.order_by('-pk').values_list('pk', flat=True))
+        with mock.patch.object(admin.site._registry[Post], 'list_per_page', 2):
+            first = self.client.get(CHANGELIST)
+            self.assertEqual(self.pks(first), pks[:2])
+            self.assertIsNone(first.context['cl'].previous_url)
+            second = self.client.get(CHANGELIST + first.context['cl'].next_url)
+            self.assertEqual(self.pks(second), pks[2:4])
+            last = self.client.get(CHANGELIST + second.context['cl'].next_url)
+            self.assertEqual(self.pks(last), pks[4:])
+            self.assertIsNone(last.context['cl'].next_url)
+            back = self.client.get(
+                CHANGELIST + last.context['cl'].previous_url
+            )
+            self.assertEqual(self.pks(back), pks[2:4])
+        self.assertEqual(first.context['cl'].result_count, 5)
+        self.assertContains(first, 'Вперёд')
+
+    def test_filtered_count_is_capped(self):
+        """С фильтром строки считаются не дальше count_limit."""
+        self.grow(5)
+        with mock.patch.object(admin.site._registry[Post], 'count_limit', 3):
+            response = self.client.get(
+                CHANGELIST, {'group__id__exact': self.groups[0].pk}
+            )
+        self.assertEqual(len(response.context['cl'].result_list), 3)
+        self.assertEqual(response.context['cl'].result_count, 3)
+        self.assertTrue(response.context['cl'].count_is_estimate)
+        self.assertContains(response, 'около')
+
+    def test_changelist_queries_do_not_grow(self):
+        """Число SQL списка постов в админке не зависит от числа постов."""
+        self.assertQueriesConstant(
+            {'changelist': (lambda: self.client.get(CHANGELIST), 5)},
+            sizes=(1, 10, 200),
+            grow=self.grow,
+        )
+
+    def test_group_select_lists_only_selected_group(self):
+        """list_editable не выводит в строке все группы."""
+        self.grow(1)
+        response = self.client.get(CHANGELIST)
+        self.assertContains(response, self.groups[0].title)
+        self.assertNotContains(response, self.groups[1].title)
+
+    def test_move_to_group(self):
+        """Перенос в группу — один UPDATE, счётчики групп пересчитаны."""
+        self.grow(4)
+        response = self.client.post(CHANGELIST, {
+            'action': 'move_to_group',
+            'group': self.groups[1].slug,
+            admin.ACTION_CHECKBOX_NAME: list(
+                Post.objects.values_list('pk', flat=True)
+            ),
+        })
+        self.assertRedirects(response, CHANGELIST)
+        self.assertEqual(Post.objects.filter(group=self.groups[1]).count(), 4)
+        for group, count in zip(self.groups, (0, 4)):
+            group.refresh_from_db()
+            self.assertEqual(group.post_count, count)
+
+    def test_move_to_unknown_group(self):
+        """Неизвестный слаг группы ничего не меняет."""
+        self.grow(2)
+        response = self.client.post(CHANGELIST, {
+            'action': 'move_to_group',
+            'group': 'missing',
+            admin.ACTION_CHECKBOX_NAME: list(
+                Post.objects.values_list('pk', flat=True)
+            ),
+        }, follow=True)
+        self.assertContains(response, 'не найдена')
+        self.assertEqual(Post.objects.filter(group=self.groups[0]).count(), 1)
+
+    def test_delete_author_posts(self):
+        """Удаляются все посты авторов выбранных постов, не только они."""
+        self.grow(6)
+        author = self.authors[0]
+        TimelineEntry.objects.create(
+            user=self.admin, author=author,
+            post=Post.objects.filter(author=author).first(),
+            pub_date=Post.objects.filter(author=author).first().pub_date,
+        )
+        selected = Post.objects.filter(author=author).first()
+        response = self.client.post(CHANGELIST, {
+            'action': 'delete_author_posts',
+            admin.ACTION_CHECKBOX_NAME: [selected.pk],
+        })
+        self.assertRedirects(response, CHANGELIST)
+        self.assertFalse(Post.objects.filter(author=author).exists())
+        self.assertEqual(
+            Post.objects.filter(author=self.authors[1]).count(), 3
+        )
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(AuthorStats.objects.get(author=author).post_count, 0)
+        self.groups[0].refresh_from_db()
+        self.assertEqual(self.groups[0].post_count, 0)
+
+    def test_delete_posts_of_changed_author(self):
+        """Записи лент удаляются по текущему автору поста, не по копии."""
+        old_author, new_author = self.authors
+        follow(self.admin, old_author)
+        post = Post.objects.create(text='Пост', author=old_author)
+        Post.objects.filter(pk=post.pk).update(author=new_author)
+        self.assertEqual(bulk.delete_author_posts([new_author.pk]), 1)
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(TimelineEntry.objects.exists())
@@ -0,0 +1,106 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..utils import CursorPaginator
+
+POSTS_TOTAL = 25
+
+
+class FeedApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.other = User.objects.create_user(username='other-author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=cls.user,
+                 group=cls.group if number % 2 else None)
+            for number in range(POSTS_TOTAL)
+        )
+
+    def get(self, url, data=None):
+        response = self.client.get(url, data)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        if response.streaming:
+            return response, json.loads(b''.join(response.streaming_content))
+        return response, response.json()
+
+    def walk(self, url, data=None):
+        data = dict(data or {})
+        results = []
+        while True:
+            response, body = self.get(url, data)
+            self.assertEqual(response.status_code, 200)
+            results += body['results']
+            if body['next'] is None:
+                return results
+            data['cursor'] = body['next']
+
+    def test_feeds_match_querysets(self):
+        """API отдаёт те же посты и в том же порядке, что и HTML-ленты."""
+        feeds = (
+            (reverse('posts:api_index'), Post.objects.all()),
+            (reverse('posts:api_group_list', args=(self.group.slug,)),
+             self.group.posts.all()),
+            (reverse('posts:api_profile', args=(self.user.username,)),
+             self.user.posts.all()),
+        )
+        for url, queryset in feeds:
+            with self.subTest(url=url):
+                walked = self.walk(url, {'limit': 7})
+                self.assertEqual(
+                    [post['id'] for post in walked],
+                    list(queryset.order_by(*CursorPaginator.ordering)
+                         .values_list('pk', flat=True)),
+                )
+
+    def test_fields_selection(self):
+        """Клиент получает только запрошенные поля."""
+        _, body = self.get(
+            reverse('posts:api_index'), {'fields': 'id,author,group'}
+        )
+        post = Post.objects.order_by(*CursorPaginator.ordering).first()
+        self.assertEqual(body['results'][0], {
+            'id': post.pk,
+            'author': self.user.username,
+            'group': post.group and post.group.slug,
+        })
+        _, body = self.get(reverse('posts:api_index'))
+        self.assertEqual(
+            set(body['results'][0]),
+            {'id', 'text', 'pub_date', 'author', 'group'}
+        )
+
+    def test_bad_requests(self):
+        """Неизвестные поля и limit дают 400, чужие ленты — 404."""
+        for data in ({'fields': 'id,password'}, {'limit': 'много'}):
+            with self.subTest(data=data):
+                response, body = self.get(reverse('posts:api_index'), data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', body)
+        for url in (
+            reverse('posts:api_group_list', args=('missing',)),
+            reverse('posts:api_profile', args=('missing',)),
+        ):
+            with self.subTest(url=url):
+                response, _ = self.get(url)
+                self.assertEqual(response.status_code, 404)
+        response, body = self.get(
+            reverse('posts:api_profile', args=(self.other.username,))
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, {'results': [], 'next': None})
+
+    def test_no_templates(self):
+        """Ответ собирается без шаблонизатора."""
+        response = self.client.get(reverse('posts:api_index'))
+        b''.join(response.streaming_content)
+        self.assertEqual(response.templates, [])
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+
+from ..benchmarks import (render_cards_one_by_one, run_view_benchmarks,
+                          seed_posts, template_settings, view_targets)
+from ..models import AuthorStats, Group, Post, User
+from ..templatetags.post_cards import render_cards
+
+
+class BenchmarkSmokeTests(TestCase):
+    """Генератор данных и замеры работают на маленьком объёме."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author_ids, cls.group_ids = seed_posts(
+            300, authors=5, groups=3, skew=1.5
+        )
+
+    def test_seed_volumes_and_skew(self):
+        """Наполнение даёт нужный объём, перекос и верные счётчики."""
+        self.assertEqual(Post.objects.count(), 300)
+        counts = [
+            AuthorStats.objects.get(author_id=author_id).post_count
+            for author_id in self.author_ids
+        ]
+        self.assertEqual(sum(counts), 300)
+        self.assertEqual(max(counts), counts[0])
+        group = Group.objects.get(pk=self.group_ids[0])
+        self.assertEqual(group.post_count, group.posts.count())
+
+    def test_every_view_measured(self):
+        """Каждое представление замерено и отвечает без ошибок."""
+        author = User.objects.get(pk=self.author_ids[0])
+        group = Group.objects.get(pk=self.group_ids[0])
+        client = Client()
+        client.force_login(author)
+        targets = view_targets(
+            author, group, author.posts.first(), settings.POSTS_IN_PAGE
+        )
+        results = run_view_benchmarks(targets, client, repeat=2, warmup=0)
+        self.assertEqual(
+            {result['view'] for result in results},
+            {'index', 'group_posts', 'profile', 'post_detail',
+             'post_create', 'post_edit'}
+        )
+        for result in results:
+            with self.subTest(view=result['view'], page=result['page']):
+                self.assertIn(result['status'], (200, 302))
+                self.assertGreater(result['queries'], 0)
+                self.assertLessEqual(
+                    result['latency_ms']['p50'], result['latency_ms']['max']
+                )
+
+    def test_render_paths_agree(self):
+        """Оба пути рендера карточек дают одинаковый HTML."""
+        posts = list(Post.objects.select_related('author', 'group')[:10])
+        for cached in (False, True):
+            with override_settings(TEMPLATES=template_settings(cached)):
+                for flag_profile in (False, True):
+                    with self.subTest(cached=cached, profile=flag_profile):
+                        self.assertEqual(
+                            render_cards(posts, flag_profile),
+                            render_cards_one_by_one(posts, flag_profile),
+                        )
@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from ..bulk_import import import_posts, read_records
+from ..models import Group, ImportCheckpoint, Post, User
+
+
+class BulkImportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def jsonl(self, rows):
+        return self.write(
+            'posts.jsonl', ''.join(json.dumps(row) + '\n' for row in rows)
+        )
+
+    def call(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_posts', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_jsonl_import(self):
+        """Посты создаются с датами из файла, счётчики обновляются."""
+        path = self.jsonl([
+            {'text': f'Пост {number}', 'author': 'test-author',
+             'group': 'test-slug' if number % 2 else '',
+             'pub_date': f'2020-01-0{number + 1}T10:00:00'}
+            for number in range(5)
+        ] + [
+            {'text': '', 'author': 'test-author'},
+            {'text': 'Чужой пост', 'author': 'nobody'},
+        ])
+        out, err = self.call(path, '--batch-size', '2')
+        self.assertIn('строк/с', out)
+        self.assertIn('Строка 6', err)
+        self.assertIn('Строка 7', err)
+        self.assertEqual(Post.objects.count(), 5)
+        first = Post.objects.order_by('pub_date').first()
+        self.assertEqual(first.pub_date.isoformat(),
+                         '2020-01-01T10:00:00+00:00')
+        self.assertEqual(first.modified, first.pub_date)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.post_count, 2)
+        self.assertEqual(self.user.post_stats.post_count, 5)
+        self.assertEqual(
+            ImportCheckpoint.objects.get(name=os.path.abspath(path)).rows, 7
+        )
+        self.assertEqual(Post._meta.get_field('pub_date').auto_now_add, True)
+
+    def test_csv_import_creates_missing(self):
+        """CSV с --create-missing заводит новых авторов и группы."""
+        path = self.write(
+            'posts.csv',
+            'text,author,group,pub_date\n'
+            '"Многострочный\nпост",new-author,new-group,\n'
+        )
+        self.call(path, '--create-missing')
+        post = Post.objects.get()
+        self.assertEqual(post.text, 'Многострочный\nпост')
+        self.assertEqual(post.author.username, 'new-author')
+        self.assertEqual(post.group.slug, 'new-group')
+
+    def test_resume_after_crash(self):
+        """После сбоя импорт продолжается без потерь и дублей."""
+        path = self.jsonl(
+            {'text': f'Пост {number}', 'author': 'test-author'}
+            for number in range(10)
+        )
+        checkpoint = ImportCheckpoint.objects.create(
+            name=os.path.abspath(path)
+        )
+        with open(path, encoding='utf-8') as stream:
+            batches = import_posts(
+                read_records(stream, 'jsonl'), checkpoint, batch_size=3
+            )
+            next(batches)
+            next(batches)
+        self.assertEqual(Post.objects.count(), 6)
+        out, _ = self.call(path, '--batch-size', '3')
+        self.assertIn('Продолжаем со строки 7', out)
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            sorted(f'Пост {number}' for number in range(10))
+        )
+        out, _ = self.call(path)
+        self.assertIn('Новых строк нет', out)
+        self.assertEqual(Post.objects.count(), 10)
+        self.call(path, '--restart')
+        self.assertEqual(Post.objects.count(), 20)
+
+    def test_model_fields_are_not_patched(self):
+        """Во время вставки auto_now_add остальных сохранений работает."""
+        path = self.jsonl([{
+            'text': 'Пост', 'author': 'test-author',
+            'pub_date': '2020-01-01T10:00:00',
+        }])
+        checkpoint = ImportCheckpoint.objects.create(name=path)
+        flags = []
+
+        def check(execute, sql, params, many, context):
+            if sql.startswith(f'INSERT INTO "{Post._meta.db_table}"'):
+                field = Post._meta.get_field('pub_date')
+                flags.append(field.auto_now_add)
+            return execute(sql, params, many, context)
+
+        with open(path, encoding='utf-8') as stream, \
+                connection.execute_wrapper(check):
+            list(import_posts(read_records(stream, 'jsonl'), checkpoint))
+        self.assertEqual(flags, [True])
+        self.assertEqual(Post.objects.get().pub_date.year, 2020)
@@ -0,0 +1,299 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..cache import STATS_KEY, page_cache_stats, reset_page_cache_stats
+from ..models import Group, Post, User
+from ..templatetags.post_cards import CARD_TEMPLATE, UrlBuilder, render_cards
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=60)
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.other = User.objects.create_user(username='other-author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.group2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test-slug2',
+            description='Тестовое описание 2',
+        )
+
+    def setUp(self):
+        cache.clear()
+        reset_page_cache_stats()
+        self.post = Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group
+        )
+        self.urls = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_list', args=(self.group.slug,)),
+            'group2': reverse('posts:group_list', args=(self.group2.slug,)),
+            'profile': reverse('posts:profile', args=(self.user.username,)),
+            'other': reverse('posts:profile', args=(self.other.username,)),
+            'detail': reverse('posts:post_detail', args=(self.post.pk,)),
+        }
+
+    def cached(self):
+        """Возвращает имена страниц, отданных из кеша."""
+        return {
+            name for name, url in self.urls.items()
+            if self.client.get(url)['X-Page-Cache'] == 'hit'
+        }
+
+    def test_anonymous_hit_without_queries(self):
+        """Повторный анонимный запрос отдаётся из кеша без SQL."""
+        first = self.client.get(self.urls['index'])
+        with self.assertNumQueries(0):
+            second = self.client.get(self.urls['index'])
+        self.assertEqual(first['X-Page-Cache'], 'miss')
+        self.assertEqual(second['X-Page-Cache'], 'hit')
+        self.assertEqual(first.content, second.content)
+
+    def test_pages_keyed_by_page(self):
+        """Разные страницы ленты кешируются отдельно."""
+        self.client.get(self.urls['index'])
+        response = self.client.get(self.urls['index'], {'page': 2})
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+
+    def test_authenticated_user_bypasses_cache(self):
+        """Авторизованный пользователь всегда получает свежую страницу."""
+        self.client.get(self.urls['index'])
+        self.client.force_login(self.user)
+        response = self.client.get(self.urls['index'])
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertIn('page_obj', response.context)
+
+    def test_edit_drops_only_affected_pages(self):
+        """Перенос поста сбрасывает только затронутые страницы."""
+        self.cached()
+        self.assertEqual(self.cached(), set(self.urls))
+        self.client.force_login(self.user)
+        self.client.post(
+            reverse('posts:post_edit', args=(self.post.pk,)),
+            data={'text': 'Новый текст', 'group': self.group2.pk},
+        )
+        self.client.logout()
+        self.assertEqual(self.cached(), {'other'})
+        self.assertContains(self.client.get(self.urls['detail']),
+                            'Новый текст')
+
+    def test_create_keeps_other_author_pages(self):
+        """Новый пост не трогает страницы чужих авторов и групп."""
+        self.cached()
+        Post.objects.create(text='Другой пост', author=self.other)
+        self.assertEqual(self.cached(), {'group', 'group2', 'profile',
+                                         'detail'})
+
+    def test_stats(self):
+        """Статистика считает попадания, промахи и инвалидации."""
+        self.client.get(self.urls['index'])
+        self.client.get(self.urls['index'])
+        self.post.delete()
+        stats = page_cache_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_ratio'], 0.5)
+        self.assertGreater(stats['invalidations'], 0)
+
+    def test_stats_are_written_in_batches(self):
+        """Запросы копят статистику в памяти и не пишут её в кеш."""
+        for _ in range(3):
+            self.client.get(self.urls['index'])
+        self.assertIsNone(cache.get(STATS_KEY.format('hits')))
+        self.assertEqual(page_cache_stats()['hits'], 2)
+        self.assertEqual(cache.get(STATS_KEY.format('hits')), 2)
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост', author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.auth_client = self.client_class()
+        self.auth_client.force_login(self.user)
+
+    def test_cards_rendered_once(self):
+        """Карточки рендерятся один раз и для авторизованных."""
+        url = reverse('posts:index')
+        self.auth_client.get(url)
+        response = self.auth_client.get(url)
+        self.assertContains(response, self.post.text)
+        self.assertTemplateNotUsed(response, CARD_TEMPLATE)
+
+    def test_variants_cached_separately(self):
+        """В профиле своя разметка карточки без ссылки на автора."""
+        profile_link = reverse('posts:profile', args=(self.user.username,))
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(profile_link)
+        self.assertTemplateUsed(response, CARD_TEMPLATE)
+        self.assertNotContains(response, f'href="{profile_link}"')
+
+    def test_edit_and_group_change_refresh_card(self):
+        """Правка поста и слага группы дают свежую карточку."""
+        url = reverse('posts:index')
+        self.auth_client.get(url)
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        self.assertContains(self.auth_client.get(url), 'Исправленный текст')
+        self.group.slug = 'new-slug'
+        self.group.save()
+        self.assertContains(
+            self.auth_client.get(url),
+            reverse('posts:group_list', args=('new-slug',))
+        )
+
+
+class CardRenderTests(TestCase):
+    def test_url_builder_matches_reverse(self):
+        """UrlBuilder даёт те же адреса, что reverse()."""
+        for viewname, values in (
+            ('posts:profile', ('user', 'first.last+tag@mail', 'имя', 'a b')),
+            ('posts:group_list', ('slug', 'slug-2')),
+            ('posts:post_detail', (1, 918273645)),
+        ):
+            build = UrlBuilder(viewname)
+            for value in values:
+                with self.subTest(viewname=viewname, value=value):
+                    self.assertEqual(
+                        build(value), reverse(viewname, args=(value,))
+                    )
+
+    def test_render_cards(self):
+        """Карточки страницы содержат ссылки на пост, автора и группу."""
+        user = User.objects.create_user(username='card.author')
+        group = Group.objects.create(
+            title='Группа', slug='card-group', description=''
+        )
+        posts = [
+            Post.objects.create(text='С группой', author=user, group=group),
+            Post.objects.create(text='Без группы', author=user),
+        ]
+        with_group, without_group = render_cards(posts)
+        for card, post in zip((with_group, without_group), posts):
+            with self.subTest(post=post):
+                self.assertIn(post.text, card)
+                self.assertIn(
+                    reverse('posts:post_detail', args=(post.pk,)), card
+                )
+                self.assertIn(
+                    reverse('posts:profile', args=(user.username,)), card
+                )
+        self.assertIn(
+            reverse('posts:group_list', args=(group.slug,)), with_group
+        )
+        self.assertIn('ни в одном сообществе', without_group)
+        profile_cards = render_cards(posts, flag_profile=True)
+        self.assertNotIn(
+            reverse('posts:profile', args=(user.username,)), profile_cards[0]
+        )
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group
+        )
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        )
+
+    def test_not_modified_without_render(self):
+        """Совпавший ETag или Last-Modified даёт 304 без рендера."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.has_header('ETag'))
+                for headers in (
+                    {'HTTP_IF_NONE_MATCH': response['ETag']},
+                    {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']},
+                ):
+                    cached = self.client.get(url, **headers)
+                    self.assertEqual(cached.status_code, 304)
+                    self.assertEqual(cached.templates, [])
+
+    def test_edit_and_delete_change_etag(self):
+        """Правка и удаление поста меняют ETag всех его страниц."""
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        self.post.text = 'Изменённый пост'
+        self.post.save()
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url]
+                )
+                self.assertEqual(response.status_code, 200)
+                etags[url] = response['ETag']
+        self.post.delete()
+        for url in self.urls[:3]:
+            with self.subTest(url=url):
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url]
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user_and_page(self):
+        """ETag различается для пользователей и страниц ленты."""
+        url = self.urls[0]
+        anonymous = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url, {'page': 2})['ETag'],
+                            anonymous)
+        self.client.force_login(self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=anonymous)
+        self.assertEqual(response.status_code, 200)
+
+    def test_last_modified_only_for_anonymous(self):
+        """Last-Modified анонимной страницы не даёт 304 вошедшему."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.client.logout()
+                modified = self.client.get(url)['Last-Modified']
+                self.client.force_login(self.user)
+                response = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=modified
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_missing_objects_still_404(self):
+        """Для несуществующих объектов валидаторов нет, ответ 404."""
+        for url in (
+            reverse('posts:group_list', args=('missing',)),
+            reverse('posts:profile', args=('missing',)),
+            reverse('posts:post_detail', args=(self.post.pk + 100,)),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertFalse(response.has_header('ETag'))
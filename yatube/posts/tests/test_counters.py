@@ -0,0 +1,177 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.sqlite import write_with_retry
+
+from ..models import AuthorStats, Group, Post, User
+
+
+class PostCountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.group2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test-slug2',
+            description='Тестовое описание 2',
+        )
+
+    def setUp(self):
+        self.auth_client = self.client_class()
+        self.auth_client.force_login(self.user)
+
+    def assert_counters(self, author_count, group_count, group2_count):
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).post_count,
+            author_count
+        )
+        self.group.refresh_from_db()
+        self.group2.refresh_from_db()
+        self.assertEqual(self.group.post_count, group_count)
+        self.assertEqual(self.group2.post_count, group2_count)
+
+    def test_create_move_delete(self):
+        """Счётчики следуют за созданием, переносом и удалением поста."""
+        self.auth_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Пост', 'group': self.group.pk},
+        )
+        post = Post.objects.get()
+        self.assert_counters(1, 1, 0)
+
+        self.auth_client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            data={'text': 'Пост', 'group': self.group2.pk},
+        )
+        self.assert_counters(1, 0, 1)
+
+        post = Post.objects.get()
+        post.group = None
+        post.save()
+        post.save()
+        self.assert_counters(1, 0, 0)
+
+        Post.objects.create(text='Ещё пост', author=self.user,
+                            group=self.group)
+        Post.objects.all().delete()
+        self.assert_counters(0, 0, 0)
+
+    def test_uncounted_post_delete_stops_at_zero(self):
+        """Удаление поста, не попавшего в счётчики, не уводит их в минус."""
+        Post.objects.create(text='Пост', author=self.user, group=self.group)
+        Post.objects.bulk_create([
+            Post(text='Без сигналов', author=self.user, group=self.group)
+        ])
+        for post in Post.objects.all():
+            post.delete()
+        self.assert_counters(0, 0, 0)
+
+    def test_admin_list_editable_moves_post(self):
+        """Перенос поста через list_editable в админке."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        post = Post.objects.create(text='Пост', author=self.user,
+                                   group=self.group)
+        self.client.force_login(admin)
+        self.client.post(reverse('admin:posts_post_changelist'), {
+            'form-TOTAL_FORMS': 1,
+            'form-INITIAL_FORMS': 1,
+            'form-0-id': post.pk,
+            'form-0-group': self.group2.pk,
+            '_save': 'Сохранить',
+        })
+        self.assertEqual(Post.objects.get().group, self.group2)
+        self.assert_counters(1, 0, 1)
+
+    def test_pages_read_counter(self):
+        """profile и post_detail не считают посты автора."""
+        post = Post.objects.create(text='Пост', author=self.user)
+        # Первый запрос — поиск id для ETag условного GET.
+        urls = (
+            (reverse('posts:profile', args=(self.user.username,)), 3),
+            (reverse('posts:post_detail', args=(post.pk,)), 2),
+        )
+        for url, queries in urls:
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries) as context:
+                    response = self.client.get(url)
+                self.assertEqual(response.context['count'], 1)
+                for query in context.captured_queries:
+                    self.assertNotIn('COUNT', query['sql'])
+
+    def test_rebuild_command(self):
+        """Команда находит и исправляет рассинхронизацию."""
+        Post.objects.bulk_create(
+            Post(text='Пост', author=self.user, group=self.group)
+            for _ in range(3)
+        )
+        with self.assertRaises(CommandError):
+            call_command('rebuild_post_counters', check=True,
+                         stdout=StringIO())
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assert_counters(3, 3, 0)
+        call_command('rebuild_post_counters', check=True, stdout=StringIO())
+
+
+@override_settings(SQLITE_WRITE_RETRIES=1, SQLITE_WRITE_RETRY_DELAY=0)
+class RetriedSaveCountersTests(TransactionTestCase):
+    """Повтор откатившегося сохранения не сбивает счётчики."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='test-author')
+        self.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='',
+        )
+        self.group2 = Group.objects.create(
+            title='Тестовая группа 2', slug='test-slug2', description='',
+        )
+
+    def save_once_locked(self, post):
+        """Сохраняет post, откатив первую попытку блокировкой базы."""
+        errors = [OperationalError('database is locked')]
+
+        def save():
+            post.save()
+            if errors:
+                raise errors.pop()
+        write_with_retry(save, instances=[post])
+
+    def assert_counters(self, author_count, group_count, group2_count):
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).post_count,
+            author_count
+        )
+        self.assertEqual(
+            list(Group.objects.order_by('pk').values_list(
+                'post_count', flat=True
+            )),
+            [group_count, group2_count],
+        )
+
+    def test_retried_edit(self):
+        """Перенос поста в другую группу с повтором."""
+        Post.objects.create(text='Пост', author=self.user, group=self.group)
+        post = Post.objects.get()
+        post.group = self.group2
+        self.save_once_locked(post)
+        self.assertEqual(Post.objects.get().group, self.group2)
+        self.assert_counters(1, 0, 1)
+
+    def test_retried_create(self):
+        """Новый пост с повтором вставляется и считается один раз."""
+        post = Post(text='Пост', author=self.user, group=self.group)
+        self.save_once_locked(post)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(Post.objects.get().pk, post.pk)
+        self.assert_counters(1, 1, 0)
@@ -0,0 +1,110 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..export import export_queryset, iter_rows
+from ..models import Group, Post, User
+
+
+class PostExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.other = User.objects.create_user(username='other-author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост, "{number}"\nстрока', author=cls.user,
+                 group=cls.group if number % 2 else None)
+            for number in range(7)
+        )
+        Post.objects.create(text='Чужой пост', author=cls.other)
+        cls.staff = User.objects.create_user(
+            username='staff', is_staff=True
+        )
+
+    def export(self, data=None):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('posts:export_posts'), data)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_csv_round_trip(self):
+        """CSV содержит все посты с автором и группой."""
+        rows = list(csv.DictReader(io.StringIO(self.export().decode())))
+        self.assertEqual(len(rows), Post.objects.count())
+        post = Post.objects.filter(group=self.group).first()
+        row = next(row for row in rows if row['id'] == str(post.pk))
+        self.assertEqual(row['text'], post.text)
+        self.assertEqual(row['author'], 'test-author')
+        self.assertEqual(row['group'], 'test-slug')
+
+    def test_filters_and_gzip(self):
+        """Фильтры по группе и автору, JSONL в gzip."""
+        content = self.export({
+            'format': 'jsonl', 'group': 'test-slug',
+            'author': 'test-author', 'gzip': '1',
+        })
+        rows = [
+            json.loads(line)
+            for line in gzip.decompress(content).decode().splitlines()
+        ]
+        self.assertEqual(
+            sorted(row['id'] for row in rows),
+            sorted(self.group.posts.values_list('pk', flat=True))
+        )
+
+    def test_date_range(self):
+        """since включительно, until исключительно."""
+        posts = list(Post.objects.order_by('pub_date'))
+        queryset = export_queryset(
+            since=posts[1].pub_date.isoformat(),
+            until=posts[-1].pub_date.isoformat(),
+        )
+        self.assertEqual(
+            set(queryset.values_list('pk', flat=True)),
+            {post.pk for post in posts[1:-1]
+             if post.pub_date < posts[-1].pub_date}
+        )
+
+    def test_chunked_iteration(self):
+        """Строки читаются порциями отдельных запросов."""
+        with self.assertNumQueries(3):
+            rows = list(iter_rows(Post.objects.all(), chunk_size=3))
+        self.assertEqual(len(rows), Post.objects.count())
+        self.assertEqual(len({row[0] for row in rows}), len(rows))
+
+    def test_staff_only_and_bad_params(self):
+        """Выгрузка только для персонала, ошибки параметров — 400."""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('posts:export_posts'))
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(self.staff)
+        for data in ({'format': 'xml'}, {'group': 'missing'},
+                     {'since': 'вчера'}):
+            with self.subTest(data=data):
+                response = self.client.get(
+                    reverse('posts:export_posts'), data
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_command(self):
+        """Команда пишет выгрузку в файл."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'posts.jsonl.gz')
+            call_command('export_posts', '--format', 'jsonl', '--gzip',
+                         '--author', 'other-author', '--output', path)
+            with gzip.open(path, 'rt', encoding='utf-8') as file:
+                rows = [json.loads(line) for line in file]
+        self.assertEqual([row['text'] for row in rows], ['Чужой пост'])
@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+@override_settings(FEED_CACHE_TIMEOUT=60)
+class SyndicationFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Тестовый пост', author=self.user, group=self.group
+        )
+        self.feeds = {
+            reverse('posts:feed', args=('rss',)): 0,
+            reverse('posts:feed', args=('atom',)): 0,
+            reverse('posts:group_feed', args=(self.group.slug, 'atom')): 1,
+            reverse('posts:profile_feed', args=(self.user.username, 'rss')): 1,
+        }
+
+    def test_feeds_list_posts(self):
+        """Ленты Atom и RSS содержат пост и ссылку на него."""
+        for url in self.feeds:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('xml', response['Content-Type'])
+                self.assertContains(response, self.post.text)
+                self.assertContains(response, reverse(
+                    'posts:post_detail', args=(self.post.pk,)
+                ))
+
+    def test_cached_until_scope_changes(self):
+        """XML берётся из кеша, пока пост в ленте не изменится."""
+        for url, queries in self.feeds.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url)['X-Page-Cache'], 'miss')
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url)
+                self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.post.text = 'Изменённый пост'
+        self.post.save()
+        for url in self.feeds:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response['X-Page-Cache'], 'miss')
+                self.assertContains(response, 'Изменённый пост')
+
+    def test_conditional_get(self):
+        """Неизменившаяся лента отвечает 304 по ETag и Last-Modified."""
+        for url in self.feeds:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                for headers in (
+                    {'HTTP_IF_NONE_MATCH': response['ETag']},
+                    {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']},
+                ):
+                    self.assertEqual(
+                        self.client.get(url, **headers).status_code, 304
+                    )
+
+    def test_missing_feeds(self):
+        """Неизвестный формат и несуществующий объект дают 404."""
+        for url in (
+            reverse('posts:feed', args=('json',)),
+            reverse('posts:group_feed', args=('missing', 'rss')),
+            reverse('posts:profile_feed', args=('missing', 'atom')),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
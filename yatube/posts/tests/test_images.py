@@ -0,0 +1,94 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..models import Post, User
+from ..thumbnails import VARIANTS, stored_thumbnails
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_file(name='image.png', size=(1600, 900)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'teal').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, TASKS_SYNC=True)
+class PostImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def create(self):
+        self.client.post(reverse('posts:post_create'), {
+            'text': 'Пост с картинкой', 'image': image_file(),
+        })
+        return Post.objects.get()
+
+    def test_upload_generates_thumbnails(self):
+        """Загрузка через форму сохраняет картинку и все миниатюры."""
+        post = self.create()
+        self.assertTrue(post.image.name.startswith('posts/'))
+        stored = stored_thumbnails(post)
+        self.assertEqual(stored['source'], post.image.name)
+        for variant, options in VARIANTS.items():
+            with self.subTest(variant=variant):
+                self.assertEqual(
+                    [width for _, width, _ in stored[variant]],
+                    list(options['widths'])
+                )
+
+    def test_pages_use_srcset(self):
+        """Ленты и пост выводят srcset готовых миниатюр и loading."""
+        post = self.create()
+        stored = stored_thumbnails(post)
+        pages = (
+            (reverse('posts:index'), 'card'),
+            (reverse('posts:profile', args=(self.user.username,)), 'card'),
+            (reverse('posts:post_detail', args=(post.pk,)), 'detail'),
+        )
+        for url, variant in pages:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                for thumb_url, width, _ in stored[variant]:
+                    self.assertContains(response, f'{thumb_url} {width}w')
+                self.assertContains(
+                    response,
+                    f'loading="{VARIANTS[variant]["loading"]}"'
+                )
+
+    def test_new_image_replaces_thumbnails(self):
+        """Смена картинки пересоздаёт миниатюры, удаление — очищает."""
+        post = self.create()
+        old = stored_thumbnails(post)
+        self.client.post(reverse('posts:post_edit', args=(post.pk,)), {
+            'text': post.text, 'image': image_file('other.png', (800, 800)),
+        })
+        post.refresh_from_db()
+        self.assertNotEqual(stored_thumbnails(post), old)
+        self.assertEqual(
+            stored_thumbnails(post)['source'], post.image.name
+        )
+        self.client.post(reverse('posts:post_edit', args=(post.pk,)), {
+            'text': post.text, 'image-clear': 'on',
+        })
+        post.refresh_from_db()
+        self.assertFalse(post.image)
+        self.assertEqual(post.thumbnails, '')
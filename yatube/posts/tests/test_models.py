@@ -1,6 +1,12 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template.defaultfilters import linebreaks_filter, linebreaksbr
 from django.test import TestCase
+from django.urls import reverse
 
-from ..models import Group, Post, User
+from ..models import EXCERPT_LENGTH, Group, Post, User
 
 
 class PostsModelTests(TestCase):
@@ -75,3 +81,54 @@ class PostsModelTests(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     self.group._meta.get_field(field).help_text, expected)
+
+
+class RenderedTextTests(TestCase):
+    TEXT = 'Первая <строка> & "кавычки"\nвторая\n\nновый абзац'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+
+    def assert_rendered(self, post):
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, linebreaks_filter(post.text))
+        self.assertEqual(post.text_br_html, linebreaksbr(post.text))
+        self.assertEqual(post.excerpt, post.text[:EXCERPT_LENGTH])
+
+    def test_rendered_on_save(self):
+        """HTML текста готовится при создании и правке поста."""
+        post = Post.objects.create(text=self.TEXT, author=self.user)
+        self.assert_rendered(post)
+        self.assertIn('&lt;строка&gt;', post.text_html)
+        post.text = 'Новый текст'
+        post.save(update_fields=('text',))
+        self.assert_rendered(post)
+
+    def test_long_text_excerpt(self):
+        """Выдержка обрезается до EXCERPT_LENGTH символов."""
+        post = Post.objects.create(text='слово ' * 100, author=self.user)
+        self.assertEqual(len(post.excerpt), EXCERPT_LENGTH)
+        self.assertTrue(post.excerpt.endswith('…'))
+
+    def test_templates_use_stored_html(self):
+        """Страницы выводят сохранённый HTML, а не текст заново."""
+        cache.clear()
+        post = Post.objects.create(text=self.TEXT, author=self.user)
+        Post.objects.filter(pk=post.pk).update(
+            text_html='<p>из базы</p>', text_br_html='из базы'
+        )
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:post_detail', args=(post.pk,)),
+        ):
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'из базы')
+
+    def test_backfill_command(self):
+        """render_post_text заполняет HTML у старых постов."""
+        post = Post.objects.create(text=self.TEXT, author=self.user)
+        Post.objects.update(text_html='', text_br_html='', excerpt='')
+        call_command('render_post_text', stdout=StringIO())
+        self.assert_rendered(post)
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Post, PostPopularity, User
+from ..popular import view_counter, write_views
+
+
+@override_settings(VIEW_COUNTER_FLUSH_SECONDS=3600, VIEW_COUNTER_FLUSH_SIZE=5)
+class PopularPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.posts = [
+            Post.objects.create(text=f'Пост {number}', author=cls.user)
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        view_counter.take()
+
+    def views(self, post):
+        return PostPopularity.objects.filter(post=post).values_list(
+            'views', flat=True
+        ).first()
+
+    def test_views_are_buffered_and_flushed_in_batch(self):
+        """Просмотры копятся в памяти и пишутся пачкой по порогу."""
+        url = reverse('posts:post_detail', args=(self.posts[0].pk,))
+        for _ in range(4):
+            self.client.get(url)
+        self.assertIsNone(self.views(self.posts[0]))
+        self.client.get(url)
+        self.assertEqual(self.views(self.posts[0]), 5)
+
+    @override_settings(VIEW_COUNTER_FLUSH_SECONDS=0)
+    def test_flush_by_time(self):
+        """По истечении VIEW_COUNTER_FLUSH_SECONDS пишется и один просмотр."""
+        self.client.get(
+            reverse('posts:post_detail', args=(self.posts[1].pk,))
+        )
+        self.assertEqual(self.views(self.posts[1]), 1)
+
+    def test_flushes_add_up(self):
+        """Записи разных процессов складываются, а не затирают друг друга."""
+        post = self.posts[0]
+        write_views({post.pk: 2})
+        write_views({post.pk: 3, self.posts[1].pk: 1})
+        self.assertEqual(self.views(post), 5)
+        self.assertEqual(self.views(self.posts[1]), 1)
+
+    def test_deleted_post_is_skipped(self):
+        """Просмотры удалённого поста не ломают запись остальных."""
+        deleted = Post.objects.create(text='Удалённый', author=self.user)
+        deleted_pk = deleted.pk
+        deleted.delete()
+        write_views({deleted_pk: 1, self.posts[0].pk: 1})
+        self.assertEqual(
+            list(PostPopularity.objects.values_list('post', flat=True)),
+            [self.posts[0].pk],
+        )
+
+    def test_old_views_decay(self):
+        """Старые просмотры весят меньше свежих."""
+        old, fresh, unread = self.posts
+        now = timezone.now()
+        write_views(
+            {old.pk: 10},
+            now - timedelta(seconds=3 * settings.POPULAR_HALF_LIFE),
+        )
+        write_views({fresh.pk: 2}, now)
+        response = self.client.get(reverse('posts:popular'))
+        self.assertEqual(list(response.context['page_obj']), [fresh, old])
+        write_views({old.pk: 10}, now)
+        response = self.client.get(reverse('posts:popular'))
+        self.assertEqual(list(response.context['page_obj']), [old, fresh])
@@ -0,0 +1,133 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.testing import QueryBudgetMixin
+
+from ..counters import rebuild as rebuild_counters
+from ..models import Follow, Group, Post, User, render_text
+from ..popular import view_counter, write_views
+from ..timeline import backfill
+
+SIZES = (1, 10, 1000)
+AUTHORS = 5
+
+
+@override_settings(VIEW_COUNTER_FLUSH_SECONDS=3600,
+                   VIEW_COUNTER_FLUSH_SIZE=10 ** 6)
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Число SQL каждого представления posts не зависит от числа постов.
+
+    Посты раскладываются по нескольким авторам и группам, чтобы
+    ленивая загрузка связей на каждой карточке дала рост запросов.
+    Кеш очищается перед каждым запросом: замеряется холодный путь.
+    Буфер просмотров не сбрасывается во время замеров.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.authors = [
+            User.objects.create_user(username=f'author-{number}')
+            for number in range(AUTHORS)
+        ]
+        cls.author = cls.authors[0]
+        cls.reader = User.objects.create_user(username='reader')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {number}', slug=f'group-{number}',
+                description='',
+            )
+            for number in range(AUTHORS)
+        ]
+        cls.group = cls.groups[0]
+        Follow.objects.bulk_create(
+            Follow(user=cls.reader, author=author) for author in cls.authors
+        )
+
+    def setUp(self):
+        view_counter.take()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def grow(self, size):
+        """Добавляет посты до size, затем счётчики и ленту подписок."""
+        existing = Post.objects.count()
+        Post.objects.bulk_create(
+            Post(
+                text=f'Пост номер {number}',
+                author=self.authors[number % AUTHORS],
+                group=self.groups[number % AUTHORS] if number % 3 else None,
+                **render_text(f'Пост номер {number}'),
+            )
+            for number in range(existing, size)
+        )
+        rebuild_counters()
+        backfill(self.reader.pk)
+        write_views({
+            pk: 1 for pk in Post.objects.values_list('pk', flat=True)
+        })
+        self.post = Post.objects.filter(author=self.author).first()
+
+    def get(self, client, name, *args, data=None):
+        """Запрос к представлению; аргумент-функция вычисляется при
+        запросе, когда grow уже выбрал пост."""
+        def request():
+            cache.clear()
+            response = client.get(reverse(f'posts:{name}', args=[
+                arg() if callable(arg) else arg for arg in args
+            ]), data)
+            self.assertLess(response.status_code, 400, name)
+            return response
+        return request
+
+    def targets(self):
+        anonymous = Client()
+        author = self.author.username
+        slug = self.group.slug
+
+        def post():
+            return self.post.pk
+
+        # Бюджеты — холодный путь; у вошедшего пользователя из них два
+        # запроса — сессия и пользователь.
+        return {
+            'index': (self.get(anonymous, 'index'), 1),
+            'group_list': (self.get(anonymous, 'group_list', slug), 3),
+            'profile': (self.get(anonymous, 'profile', author), 3),
+            'post_detail': (self.get(anonymous, 'post_detail', post), 2),
+            'post_edit': (self.get(self.author_client, 'post_edit', post), 4),
+            'post_create': (self.get(self.author_client, 'post_create'), 3),
+            'popular': (self.get(anonymous, 'popular'), 2),
+            'search': (self.get(anonymous, 'search', data={'q': 'пост'}), 2),
+            'follow_index': (self.get(self.reader_client, 'follow_index'), 5),
+            'profile_unfollow': (
+                self.get(self.reader_client, 'profile_unfollow', author), 7
+            ),
+            'profile_follow': (
+                self.get(self.reader_client, 'profile_follow', author), 8
+            ),
+            'feed': (self.get(anonymous, 'feed', 'rss'), 1),
+            'group_feed': (
+                self.get(anonymous, 'group_feed', slug, 'atom'), 3
+            ),
+            'profile_feed': (
+                self.get(anonymous, 'profile_feed', author, 'rss'), 3
+            ),
+            'export_posts': (self.get(self.staff_client, 'export_posts'), 3),
+            'api_index': (self.get(anonymous, 'api_index'), 1),
+            'api_group_list': (
+                self.get(anonymous, 'api_group_list', slug), 2
+            ),
+            'api_profile': (self.get(anonymous, 'api_profile', author), 1),
+        }
+
+    def test_queries_do_not_grow_with_posts(self):
+        """Каждое представление укладывается в бюджет при 1, 10 и 1000
+        постах, и число запросов не растёт."""
+        self.assertQueriesConstant(self.targets(), SIZES, self.grow)
@@ -0,0 +1,147 @@
+import json
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..popular import write_views
+from ..timeline import follow
+
+# Полный проход без индекса: «SCAN posts_post» с SQLite 3.36,
+# «SCAN TABLE posts_post» раньше.
+FULL_SCAN = re.compile(r'SCAN (TABLE )?posts_(post|group)\b')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+class FeedQueryPlanTests(TestCase):
+    """Запросы лент не должны скатываться в полный проход или сортировку.
+
+    Каждый SELECT, выполненный представлением, прогоняется через
+    EXPLAIN QUERY PLAN.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=cls.user, group=cls.group)
+            for number in range(settings.POSTS_IN_PAGE * 3)
+        )
+        cls.post = Post.objects.first()
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def bad_steps(self, plan):
+        return [
+            step for step in plan
+            if FULL_SCAN.match(step) and 'USING' not in step
+            or step.startswith(TEMP_SORT)
+        ]
+
+    def test_bad_steps_in_both_plan_formats(self):
+        """Полный проход ловится в выводе старых и новых SQLite."""
+        self.assertEqual(
+            self.bad_steps([
+                'SCAN TABLE posts_post', 'SCAN posts_group',
+                'SCAN TABLE posts_post USING INDEX post_feed_idx',
+                'SCAN posts_post_fts VIRTUAL TABLE INDEX 0:',
+                'USE TEMP B-TREE FOR ORDER BY',
+            ]),
+            [
+                'SCAN TABLE posts_post', 'SCAN posts_group',
+                'USE TEMP B-TREE FOR ORDER BY',
+            ],
+        )
+
+    def assert_indexed(self, url, data=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            plan = self.explain(query['sql'])
+            self.assertFalse(
+                self.bad_steps(plan),
+                f'{url}: {query["sql"]}\n' + '\n'.join(plan)
+            )
+        return response
+
+    def test_feed_plans(self):
+        """Первые страницы лент и post_detail идут по индексам."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assert_indexed(url)
+
+    def test_deep_page_plans(self):
+        """Страницы по курсору и по ?page=N идут по индексам."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.assert_indexed(url, {'page': 2})
+                page_obj = response.context['page_obj']
+                self.assert_indexed(url, {'cursor': page_obj.next_cursor})
+                self.assert_indexed(
+                    url, {'cursor': page_obj.previous_cursor}
+                )
+
+    def test_api_plans(self):
+        """JSON API отдаёт страницу одним запросом по индексу."""
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', args=(self.group.slug,)),
+            reverse('posts:api_profile', args=(self.user.username,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with self.assertNumQueries(1):
+                    self.client.get(url)
+                response = self.assert_indexed(url)
+                cursor = json.loads(
+                    b''.join(response.streaming_content)
+                )['next']
+                self.assert_indexed(url, {'cursor': cursor})
+
+    def test_follow_feed_plans(self):
+        """Лента подписок читается проходом по индексу записей ленты."""
+        reader = User.objects.create_user(username='reader')
+        follow(reader, self.user)
+        self.client.force_login(reader)
+        url = reverse('posts:follow_index')
+        response = self.assert_indexed(url)
+        self.assert_indexed(
+            url, {'cursor': response.context['page_obj'].next_cursor}
+        )
+
+    def test_popular_plans(self):
+        """Популярные посты читаются по индексу рейтинга без сортировки."""
+        write_views({
+            post.pk: number + 1
+            for number, post in enumerate(Post.objects.all())
+        })
+        url = reverse('posts:popular')
+        self.assert_indexed(url)
+        self.assert_indexed(url, {'page': 2})
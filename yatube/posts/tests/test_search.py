@@ -0,0 +1,83 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Post, User
+from ..search import matching_posts, search_page
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.post = Post.objects.create(
+            text='Кошка спит на подоконнике', author=cls.user
+        )
+        cls.other = Post.objects.create(
+            text='Поезд уходит утром', author=cls.user
+        )
+
+    def found(self, query):
+        return [post.pk for post in search_page(query)]
+
+    def test_index_follows_create_edit_delete(self):
+        """Индекс обновляется при создании, правке и удалении поста."""
+        self.assertEqual(self.found('кошка'), [self.post.pk])
+        self.post.text = 'Собака спит на подоконнике'
+        self.post.save()
+        self.assertEqual(self.found('кошка'), [])
+        self.assertEqual(self.found('собака'), [self.post.pk])
+        self.post.delete()
+        self.assertEqual(self.found('подоконнике'), [])
+
+    def test_query_is_sanitized(self):
+        """Спецсимволы FTS5 в запросе не ломают поиск."""
+        for query in ('"', 'AND', 'кошка OR', '*', 'NEAR(', '-'):
+            with self.subTest(query=query):
+                search_page(query)
+
+    def test_ranked_cursor_walk(self):
+        """Выдача по релевантности листается курсорами без повторов."""
+        posts = Post.objects.bulk_create(
+            Post(text='мир ' * (number % 4 + 1), author=self.user)
+            for number in range(7)
+        )
+        pages = [search_page('мир', per_page=3)]
+        while pages[-1].has_next():
+            pages.append(
+                search_page('мир', pages[-1].next_cursor, per_page=3)
+            )
+        walked = [post.pk for page in pages for post in page]
+        self.assertEqual(len(walked), len(posts))
+        self.assertEqual(len(set(walked)), len(posts))
+        self.assertEqual(walked[0], Post.objects.filter(
+            text='мир ' * 4).order_by('pk').first().pk)
+        previous = search_page('мир', pages[1].previous_cursor, per_page=3)
+        self.assertEqual(list(previous), list(pages[0]))
+
+    def test_search_view(self):
+        """Страница поиска выводит найденные карточки."""
+        response = self.client.get(reverse('posts:search'), {'q': 'поезд'})
+        self.assertContains(response, self.other.text)
+        self.assertNotContains(response, self.post.text)
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт через FTS, а не через LIKE."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        self.client.force_login(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse('admin:posts_post_changelist'), {'q': 'кошка'}
+            )
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [self.post])
+        sql = '\n'.join(query['sql'] for query in context.captured_queries)
+        self.assertIn('MATCH', sql)
+        self.assertNotIn('LIKE', sql)
+        self.assertEqual(
+            list(matching_posts(Post.objects.all(), 'кошка')), [self.post]
+        )
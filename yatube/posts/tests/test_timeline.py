@@ -0,0 +1,187 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import AuthorStats, Follow, Post, TimelineEntry, User
+from ..timeline import (
+    TimelinePaginator, follow, pulled_authors, trim, unfollow,
+)
+
+
+@override_settings(TASKS_SYNC=True, TIMELINE_PULL_DAILY_POSTS=100)
+class FollowTimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def create_posts(self, author, count):
+        return [
+            Post.objects.create(text=f'Пост {author} {number}', author=author)
+            for number in range(count)
+        ]
+
+    def feed(self, per_page=10):
+        """Все посты ленты подписок, пролистанные курсорами вперёд."""
+        paginator = TimelinePaginator(self.reader, per_page)
+        page = paginator.get_cursor_page(None)
+        posts = list(page)
+        while page.has_next():
+            page = paginator.get_cursor_page(page.next_cursor)
+            posts += page
+        return posts
+
+    def newest_first(self, posts):
+        return sorted(posts, key=lambda post: (post.pub_date, post.pk),
+                      reverse=True)
+
+    def test_follow_and_unfollow_views(self):
+        """Подписка кладёт посты автора в ленту, отписка убирает их."""
+        post = self.create_posts(self.author, 1)[0]
+        profile = reverse('posts:profile', args=(self.author.username,))
+        response = self.client.get(
+            reverse('posts:profile_follow', args=(self.author.username,))
+        )
+        self.assertRedirects(response, profile)
+        self.assertTrue(Follow.objects.filter(
+            user=self.reader, author=self.author
+        ).exists())
+        self.assertEqual(
+            self.client.get(profile).context['following'], True
+        )
+        self.assertContains(
+            self.client.get(reverse('posts:follow_index')), post.text
+        )
+        self.client.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,))
+        )
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertNotContains(
+            self.client.get(reverse('posts:follow_index')), post.text
+        )
+
+    def test_cannot_follow_self(self):
+        """Подписаться на самого себя нельзя."""
+        self.client.get(
+            reverse('posts:profile_follow', args=(self.reader.username,))
+        )
+        self.assertFalse(Follow.objects.exists())
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост попадает только в ленты подписчиков автора."""
+        follow(self.reader, self.author)
+        post = self.create_posts(self.author, 1)[0]
+        self.create_posts(self.stranger, 1)
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('user', 'post')),
+            [(self.reader.pk, post.pk)],
+        )
+        self.assertEqual(self.feed(), [post])
+
+    def test_changed_author_moves_post_between_timelines(self):
+        """Пост со сменённым автором уходит к подписчикам нового автора."""
+        follow(self.reader, self.author)
+        post = self.create_posts(self.author, 1)[0]
+        post.author = self.stranger
+        post.save()
+        self.assertFalse(TimelineEntry.objects.exists())
+        follow(self.reader, self.stranger)
+        post.author = self.author
+        post.save()
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('post', 'author')),
+            [(post.pk, self.author.pk)],
+        )
+        unfollow(self.reader, self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_page_is_single_indexed_read(self):
+        """Страница ленты — один запрос к записям с постами и авторами."""
+        follow(self.reader, self.author)
+        self.create_posts(self.author, 15)
+        pulled_authors()
+        with self.assertNumQueries(1):
+            page = TimelinePaginator(self.reader, 10).get_cursor_page(None)
+            self.assertEqual(len(page), 10)
+            for post in page:
+                post.author.username
+
+    def test_trimmed_timeline_falls_back_to_posts(self):
+        """За обрезанной лентой посты дочитываются без потерь и дублей."""
+        follow(self.reader, self.author)
+        posts = self.create_posts(self.author, 23)
+        trim(self.reader.pk, 5)
+        self.assertEqual(TimelineEntry.objects.count(), 5)
+        self.assertEqual(self.feed(per_page=4), self.newest_first(posts))
+
+    @override_settings(TIMELINE_SIZE=3)
+    def test_follow_does_not_insert_below_floor(self):
+        """Подписка на автора со старыми постами не теряет посты ленты."""
+        posts = self.create_posts(self.stranger, 3)
+        posts += self.create_posts(self.author, 6)
+        follow(self.reader, self.author)
+        follow(self.reader, self.stranger)
+        self.assertEqual(TimelineEntry.objects.count(), 3)
+        self.assertEqual(self.feed(per_page=4), self.newest_first(posts))
+
+    def test_backward_from_fallback_pages(self):
+        """Листание назад из дочитанной части ведёт на нужную страницу."""
+        follow(self.reader, self.author)
+        self.create_posts(self.author, 12)
+        trim(self.reader.pk, 3)
+        paginator = TimelinePaginator(self.reader, 4)
+        pages = [paginator.get_cursor_page(None)]
+        while pages[-1].has_next():
+            pages.append(paginator.get_cursor_page(pages[-1].next_cursor))
+        for previous, page in zip(pages, pages[1:]):
+            with self.subTest(page=page):
+                self.assertEqual(
+                    list(paginator.get_cursor_page(page.previous_cursor)),
+                    list(previous),
+                )
+
+    @override_settings(TIMELINE_PULL_DAILY_POSTS=3)
+    def test_prolific_author_is_read_on_demand(self):
+        """Посты плодовитого автора не рассылаются, но есть в ленте."""
+        follow(self.reader, self.author)
+        follow(self.reader, self.stranger)
+        posts = self.create_posts(self.author, 5)
+        posts += self.create_posts(self.stranger, 2)
+        self.assertTrue(AuthorStats.objects.get(
+            author=self.author
+        ).pull_timeline)
+        self.assertLess(
+            TimelineEntry.objects.filter(author=self.author).count(), 5
+        )
+        self.assertEqual(self.feed(per_page=3), self.newest_first(posts))
+
+    def test_backfill_command(self):
+        """backfill_timelines собирает ленты заново из подписок."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = self.create_posts(self.author, 3)
+        TimelineEntry.objects.all().delete()
+        call_command('backfill_timelines', stdout=StringIO())
+        self.assertEqual(
+            set(TimelineEntry.objects.values_list('post', flat=True)),
+            {post.pk for post in posts},
+        )
+
+    def test_trim_command(self):
+        """trim_timelines оставляет в ленте последние записи."""
+        follow(self.reader, self.author)
+        posts = self.create_posts(self.author, 4)
+        call_command('trim_timelines', '--size', '2', stdout=StringIO())
+        self.assertEqual(
+            set(TimelineEntry.objects.values_list('post', flat=True)),
+            {post.pk for post in posts[-2:]},
+        )
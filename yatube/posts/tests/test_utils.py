@@ -0,0 +1,191 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..counters import rebuild as rebuild_counters
+from ..models import Group, Post, User
+from ..utils import ELLIPSIS, CursorPaginator, WindowedPaginator
+
+POSTS_TOTAL = settings.POSTS_IN_PAGE * 2 + 5
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=cls.user, group=cls.group)
+            for number in range(POSTS_TOTAL)
+        )
+        cls.expected = list(
+            Post.objects.order_by(*CursorPaginator.ordering)
+            .values_list('pk', flat=True)
+        )
+
+    def paginator(self):
+        return CursorPaginator(Post.objects.all(), settings.POSTS_IN_PAGE)
+
+    def test_walk_forward_and_back(self):
+        """Курсоры проходят ленту целиком вперёд и назад без пропусков."""
+        pages = [self.paginator().get_cursor_page(None)]
+        while pages[-1].has_next():
+            pages.append(
+                self.paginator().get_cursor_page(pages[-1].next_cursor)
+            )
+        walked = [post.pk for page in pages for post in page]
+        self.assertEqual(walked, self.expected)
+        self.assertFalse(pages[0].has_previous())
+
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = self.paginator().get_cursor_page(page.previous_cursor)
+            self.assertEqual(
+                [post.pk for post in page], [post.pk for post in expected]
+            )
+        self.assertFalse(page.has_previous())
+
+    def test_page_does_not_count(self):
+        """Страница по курсору — один запрос без COUNT(*)."""
+        first = self.paginator().get_cursor_page(None)
+        with self.assertNumQueries(1) as context:
+            page = self.paginator().get_cursor_page(first.next_cursor)
+        self.assertNotIn('COUNT', context.captured_queries[0]['sql'])
+        self.assertEqual(len(page), settings.POSTS_IN_PAGE)
+
+    def test_broken_cursor_falls_back_to_first_page(self):
+        """Испорченный курсор отдаёт первую страницу."""
+        for cursor in ('', 'garbage', '!!!', 'eDE6bm90LWEtZGF0ZQ'):
+            with self.subTest(cursor=cursor):
+                page = self.paginator().get_cursor_page(cursor)
+                self.assertEqual(
+                    [post.pk for post in page],
+                    self.expected[:settings.POSTS_IN_PAGE]
+                )
+
+    def test_legacy_page_number_continues_with_cursors(self):
+        """?page=N работает и даёт курсоры для дальнейшего листания."""
+        page = self.paginator().get_page(2)
+        self.assertEqual(
+            [post.pk for post in page],
+            self.expected[settings.POSTS_IN_PAGE:settings.POSTS_IN_PAGE * 2]
+        )
+        following = self.paginator().get_cursor_page(page.next_cursor)
+        self.assertEqual(
+            [post.pk for post in following],
+            self.expected[settings.POSTS_IN_PAGE * 2:]
+        )
+
+    def test_views_render_cursor_links(self):
+        """Ленты отдают ссылку на следующую страницу по курсору."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                page_obj = response.context['page_obj']
+                self.assertContains(
+                    response, f'?cursor={page_obj.next_cursor}'
+                )
+                response = self.client.get(
+                    url, {'cursor': page_obj.next_cursor}
+                )
+                self.assertEqual(
+                    len(response.context['page_obj']),
+                    settings.POSTS_IN_PAGE
+                )
+
+
+class WindowedPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test-author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Пост {number}', author=cls.user, group=cls.group)
+            for number in range(POSTS_TOTAL)
+        )
+        rebuild_counters()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_range_is_windowed(self):
+        """Ссылки строятся только вокруг текущей страницы и по краям."""
+        paginator = WindowedPaginator(Post.objects.all(), 1, count=100)
+        self.assertEqual(paginator.get_elided_page_range(1),
+                         [1, 2, 3, ELLIPSIS, 100])
+        self.assertEqual(paginator.get_elided_page_range(50),
+                         [1, ELLIPSIS, 48, 49, 50, 51, 52, ELLIPSIS, 100])
+        self.assertEqual(paginator.get_elided_page_range(99),
+                         [1, ELLIPSIS, 97, 98, 99, 100])
+        self.assertEqual(len(paginator.get_page(50).page_range), 9)
+        small = WindowedPaginator(Post.objects.all(), 10, count=30)
+        self.assertEqual(small.get_elided_page_range(2), [1, 2, 3])
+
+    def test_count_is_cached(self):
+        """Без счётчика COUNT(*) выполняется один раз и берётся из кэша."""
+        WindowedPaginator(Post.objects.all(), 10).get_page(1).has_next()
+        with self.assertNumQueries(1) as context:
+            page = WindowedPaginator(Post.objects.all(), 10).get_page(2)
+            self.assertTrue(page.has_next())
+            list(page)
+        self.assertNotIn('COUNT', context.captured_queries[0]['sql'])
+
+    def test_underestimated_count_keeps_last_posts(self):
+        """Заниженная оценка не обрезает последнюю страницу."""
+        paginator = WindowedPaginator(Post.objects.all(), 10, count=21)
+        self.assertEqual(len(paginator.get_page(3)), POSTS_TOTAL - 20)
+        self.assertEqual(len(paginator.get_page(100)), POSTS_TOTAL - 20)
+
+    def test_pages_beyond_underestimated_count(self):
+        """За последней по оценке страницей открываются следующие."""
+        paginator = WindowedPaginator(Post.objects.all(), 10, count=5)
+        page = paginator.get_page(1)
+        posts = list(page)
+        while page.has_next():
+            page = paginator.get_page(page.next_page_number())
+            posts += page
+        self.assertEqual(len(posts), POSTS_TOTAL)
+        self.assertEqual(len(set(posts)), POSTS_TOTAL)
+        self.assertFalse(page.has_next())
+        self.assertIn(page.number, page.page_range)
+
+    @override_settings(FEED_PAGINATION='pages')
+    def test_views_use_counters_for_pages(self):
+        """В режиме pages ленты берут число постов из счётчиков."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, {'page': 2})
+                page_obj = response.context['page_obj']
+                self.assertIsInstance(page_obj.paginator, WindowedPaginator)
+                self.assertEqual(page_obj.paginator.count, POSTS_TOTAL)
+                self.assertEqual(page_obj.number, 2)
+                self.assertContains(response, '?page=3')
+                with CaptureQueriesContext(connection) as context:
+                    self.client.get(url, {'page': 3})
+                sql = '\n'.join(
+                    query['sql'] for query in context.captured_queries
+                )
+                self.assertNotIn('COUNT', sql)
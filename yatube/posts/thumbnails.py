@@ -0,0 +1,105 @@
+import json
+
+from sorl.thumbnail import get_thumbnail
+
+from core.tasks import task
+
+from .cache import invalidate_tags, post_tags
+from .models import Post
+
+# Размеры, в которых картинка поста выводится в шаблонах. Для каждой
+# ширины из widths заранее готовится миниатюра, из них строится srcset.
+VARIANTS = {
+    'card': {
+        'widths': (480, 960),
+        'ratio': (960, 339),
+        'sizes': '(max-width: 960px) 100vw, 960px',
+        'loading': 'lazy',
+    },
+    'detail': {
+        'widths': (640, 1280),
+        'ratio': None,
+        'sizes': '(max-width: 768px) 100vw, 75vw',
+        'loading': 'eager',
+    },
+}
+QUALITY = 85
+
+
+def _thumbnail(name, width, ratio):
+    if ratio:
+        geometry = f'{width}x{round(width * ratio[1] / ratio[0])}'
+        thumb = get_thumbnail(name, geometry, crop='center', quality=QUALITY)
+    else:
+        thumb = get_thumbnail(name, f'{width}', quality=QUALITY,
+                              upscale=False)
+    return [thumb.url, thumb.width, thumb.height]
+
+
+@task(retries=2)
+def generate_thumbnails(post_id):
+    """Готовит все миниатюры картинки поста и сохраняет их адреса.
+
+    Запись идёт через update только если картинка не сменилась, пока
+    миниатюры готовились; затем сбрасываются теги страниц поста.
+    """
+    row = Post.objects.filter(pk=post_id).values_list(
+        'image', 'author_id', 'group_id'
+    ).order_by().first()
+    if row is None or not row[0]:
+        return
+    name, author_id, group_id = row
+    thumbnails = {'source': name}
+    for variant, options in VARIANTS.items():
+        thumbnails[variant] = [
+            _thumbnail(name, width, options['ratio'])
+            for width in options['widths']
+        ]
+    if Post.objects.filter(pk=post_id, image=name).update(
+        thumbnails=json.dumps(thumbnails)
+    ):
+        invalidate_tags(*post_tags(post_id, (author_id, group_id)))
+
+
+def schedule_thumbnails(post):
+    """Ставит подготовку миниатюр в очередь задач, если картинка новая."""
+    if not post.image:
+        if post.thumbnails:
+            Post.objects.filter(pk=post.pk).update(thumbnails='')
+            post.thumbnails = ''
+        return
+    if post.image.name == stored_thumbnails(post).get('source'):
+        return
+    generate_thumbnails.delay(post.pk)
+
+
+def stored_thumbnails(post):
+    try:
+        return json.loads(post.thumbnails) if post.thumbnails else {}
+    except ValueError:
+        return {}
+
+
+def image_context(post, variant):
+    """src, srcset и размеры для <img> картинки поста.
+
+    Пока миниатюры не готовы, выводится исходная картинка: шаблон
+    никогда не масштабирует её и не проверяет миниатюры на диске.
+    """
+    options = VARIANTS[variant]
+    context = {
+        'src': post.image.url,
+        'srcset': '',
+        'sizes': options['sizes'],
+        'loading': options['loading'],
+        'width': None,
+        'height': None,
+    }
+    stored = stored_thumbnails(post)
+    thumbnails = stored.get(variant)
+    if thumbnails and stored.get('source') == post.image.name:
+        context['srcset'] = ', '.join(
+            f'{url} {width}w' for url, width, _ in thumbnails
+        )
+        context['src'], context['width'], context['height'] = thumbnails[-1]
+    return context
@@ -0,0 +1,271 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from core.tasks import task
+
+from .cache import invalidate_tags
+from .models import AuthorStats, Follow, Post, TimelineEntry
+from .utils import CursorPaginator, after_key, before_key
+
+PULLED_KEY = 'timeline:pulled'
+PULLED_TIMEOUT = 60
+
+TIMELINE = TimelineEntry._meta.db_table
+FOLLOW = Follow._meta.db_table
+POST = Post._meta.db_table
+STATS = AuthorStats._meta.db_table
+
+INSERT_SQL = (
+    f'INSERT OR IGNORE INTO {TIMELINE} '
+    f'(user_id, post_id, author_id, pub_date) '
+)
+# Лента хранит непрерывное окно самых новых постов подписок: ниже самой
+# старой записи пагинатор дочитывает посты напрямую, поэтому записи
+# старше неё не добавляются — иначе посты между ними пропали бы из ленты.
+ABOVE_FLOOR_SQL = (
+    f'(NOT EXISTS (SELECT 1 FROM {TIMELINE} WHERE user_id = {{user}}) '
+    f'OR EXISTS (SELECT 1 FROM {TIMELINE} entry '
+    f'WHERE entry.user_id = {{user}} AND (entry.pub_date < post.pub_date '
+    f'OR entry.pub_date = post.pub_date AND entry.post_id <= post.id)))'
+)
+FAN_OUT_SQL = INSERT_SQL + (
+    f'SELECT follow.user_id, post.id, post.author_id, post.pub_date '
+    f'FROM {FOLLOW} follow '
+    f'JOIN {POST} post ON post.author_id = follow.author_id '
+    f'WHERE post.id = %s AND '
+) + ABOVE_FLOOR_SQL.format(user='follow.user_id')
+AUTHOR_POSTS_SQL = INSERT_SQL + (
+    f'SELECT %s, post.id, post.author_id, post.pub_date FROM {POST} post '
+    f'WHERE post.author_id = %s AND '
+) + ABOVE_FLOOR_SQL.format(user='%s') + (
+    ' ORDER BY post.pub_date DESC, post.id DESC LIMIT %s'
+)
+BACKFILL_SQL = INSERT_SQL + (
+    f'SELECT %s, post.id, post.author_id, post.pub_date '
+    f'FROM {POST} post WHERE post.author_id IN ('
+    f'SELECT follow.author_id FROM {FOLLOW} follow '
+    f'LEFT JOIN {STATS} stats ON stats.author_id = follow.author_id '
+    f'WHERE follow.user_id = %s AND NOT COALESCE(stats.pull_timeline, 0)) '
+    f'ORDER BY post.pub_date DESC, post.id DESC LIMIT %s'
+)
+FOLLOW_SQL = (
+    f'INSERT OR IGNORE INTO {FOLLOW} (user_id, author_id, created) '
+    f'VALUES (%s, %s, %s)'
+)
+TRIM_SQL = (
+    f'DELETE FROM {TIMELINE} WHERE id IN ('
+    f'SELECT id FROM {TIMELINE} WHERE user_id = %s '
+    f'ORDER BY pub_date DESC, post_id DESC LIMIT -1 OFFSET %s)'
+)
+
+
+def _execute(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def pulled_authors():
+    """id авторов с pull_timeline; кеш короткий, флаг меняется редко."""
+    pulled = cache.get(PULLED_KEY)
+    if pulled is None:
+        pulled = frozenset(AuthorStats.objects.filter(
+            pull_timeline=True
+        ).values_list('author_id', flat=True))
+        cache.set(PULLED_KEY, pulled, PULLED_TIMEOUT)
+    return pulled
+
+
+def is_prolific(author_id):
+    """Автор написал за сутки не меньше TIMELINE_PULL_DAILY_POSTS постов."""
+    since = timezone.now() - timedelta(days=1)
+    return Post.objects.filter(
+        author_id=author_id, pub_date__gte=since
+    ).count() >= settings.TIMELINE_PULL_DAILY_POSTS
+
+
+def set_pulled(author_ids, pulled):
+    AuthorStats.objects.filter(author_id__in=author_ids).update(
+        pull_timeline=pulled
+    )
+    cache.delete(PULLED_KEY)
+
+
+@task()
+def fan_out_post(post_id):
+    """Раскладывает новый пост по лентам подписчиков автора.
+
+    Один INSERT ... SELECT по подпискам автора. Посты плодовитого
+    автора не раскладываются: автор помечается pull_timeline, и его
+    посты дочитываются при показе ленты.
+    """
+    author_id = Post.objects.filter(pk=post_id).values_list(
+        'author_id', flat=True
+    ).first()
+    if author_id is None or author_id in pulled_authors():
+        return
+    if is_prolific(author_id):
+        set_pulled([author_id], True)
+        return
+    _execute(FAN_OUT_SQL, [post_id])
+
+
+def follow(user, author):
+    """Подписывает user на author и сразу кладёт в его ленту свежие
+    посты автора не старше самой старой её записи; повторная подписка
+    ничего не меняет."""
+    with transaction.atomic():
+        created = _execute(FOLLOW_SQL, [
+            user.pk, author.pk,
+            connection.ops.adapt_datetimefield_value(timezone.now()),
+        ]) == 1
+        if created and author.pk not in pulled_authors():
+            _execute(AUTHOR_POSTS_SQL, [
+                user.pk, author.pk, user.pk, user.pk, settings.TIMELINE_SIZE,
+            ])
+    invalidate_tags(f'follow:{user.pk}')
+    return created
+
+
+def unfollow(user, author):
+    with transaction.atomic():
+        Follow.objects.filter(user=user, author=author).delete()
+        TimelineEntry.objects.filter(user=user, author=author).delete()
+    invalidate_tags(f'follow:{user.pk}')
+
+
+def backfill(user_id, size=None):
+    """Собирает ленту пользователя заново из подписок."""
+    size = size or settings.TIMELINE_SIZE
+    with transaction.atomic():
+        TimelineEntry.objects.filter(user_id=user_id).delete()
+        return _execute(BACKFILL_SQL, [user_id, user_id, size])
+
+
+def refresh_pulled():
+    """Пересчитывает pull_timeline; возвращает id авторов, снова
+    рассылающих посты: их подписчикам нужен backfill."""
+    flagged = set(pulled_authors())
+    prolific = {
+        author_id for author_id in AuthorStats.objects.filter(
+            post_count__gte=settings.TIMELINE_PULL_DAILY_POSTS
+        ).values_list('author_id', flat=True)
+        if is_prolific(author_id)
+    }
+    set_pulled(prolific - flagged, True)
+    set_pulled(flagged - prolific, False)
+    return flagged - prolific
+
+
+def oversized_timelines(size=None):
+    """id пользователей, чья лента длиннее size записей."""
+    return TimelineEntry.objects.order_by().values('user_id').annotate(
+        entries=Count('id')
+    ).filter(
+        entries__gt=size or settings.TIMELINE_SIZE
+    ).values_list('user_id', flat=True)
+
+
+def trim(user_id, size=None):
+    """Удаляет из ленты всё старше size последних записей."""
+    return _execute(TRIM_SQL, [user_id, size or settings.TIMELINE_SIZE])
+
+
+class TimelinePaginator(CursorPaginator):
+    """Лента подписок на курсорах, как остальные ленты.
+
+    Основной источник — готовые записи TimelineEntry пользователя: одна
+    выборка по индексу timeline_feed_idx. К ним подмешиваются посты
+    авторов с pull_timeline, а ниже самой старой записи (ленты обрезаются
+    до TIMELINE_SIZE) посты подписок дочитываются напрямую
+    (fan-out-on-read).
+    """
+
+    def __init__(self, user, per_page):
+        self.user = user
+        super().__init__(
+            Post.objects.select_related('author', 'group'), per_page
+        )
+
+    @cached_property
+    def entries(self):
+        return TimelineEntry.objects.filter(user=self.user).select_related(
+            'post__author', 'post__group'
+        ).order_by('-pub_date', '-post_id')
+
+    @cached_property
+    def pulled(self):
+        pulled = pulled_authors()
+        if not pulled:
+            return []
+        return list(Follow.objects.filter(
+            user=self.user, author_id__in=pulled
+        ).values_list('author_id', flat=True))
+
+    @cached_property
+    def followed_posts(self):
+        return self.object_list.filter(author__following__user=self.user)
+
+    def get_page(self, number):
+        return self.get_cursor_page(None)
+
+    def _forward(self, pub_date, pk=None):
+        limit = self.per_page + 1
+        entries = self.entries
+        if pub_date is not None:
+            entries = after_key(entries, pub_date, pk, 'post_id')
+        rows = [entry.post for entry in entries[:limit]]
+        sources = [rows]
+        if self.pulled:
+            pulled = self.object_list.filter(author_id__in=self.pulled)
+            if pub_date is not None:
+                pulled = after_key(pulled, pub_date, pk)
+            sources.append(pulled[:limit])
+        if len(rows) < limit:
+            # Записи кончились: дальше лента читается из постов подписок.
+            fallback = self.followed_posts
+            if rows:
+                fallback = after_key(fallback, rows[-1].pub_date, rows[-1].pk)
+            elif pub_date is not None:
+                fallback = after_key(fallback, pub_date, pk)
+            sources.append(fallback[:limit])
+        return _merge(sources, limit, newest_first=True)
+
+    def _backward(self, pub_date, pk):
+        limit = self.per_page + 1
+        entries = before_key(self.entries, pub_date, pk, 'post_id')
+        sources = [[entry.post for entry in entries.reverse()[:limit]]]
+        if self.pulled:
+            sources.append(before_key(
+                self.object_list.filter(author_id__in=self.pulled),
+                pub_date, pk,
+            ).reverse()[:limit])
+        floor = TimelineEntry.objects.filter(user=self.user).order_by(
+            'pub_date', 'post_id'
+        ).values_list('pub_date', 'post_id').first()
+        if floor is None or (pub_date, pk) < floor:
+            fallback = before_key(self.followed_posts, pub_date, pk)
+            if floor is not None:
+                fallback = after_key(fallback, *floor)
+            sources.append(fallback.reverse()[:limit])
+        return _merge(sources, limit, newest_first=False)
+
+
+def _merge(sources, limit, newest_first):
+    posts = {post.pk: post for source in sources for post in source}
+    return sorted(
+        posts.values(),
+        key=lambda post: (post.pub_date, post.pk),
+        reverse=newest_first,
+    )[:limit]
+
+
+def follow_page(request):
+    paginator = TimelinePaginator(request.user, settings.POSTS_IN_PAGE)
+    return paginator.get_cursor_page(request.GET.get('cursor'))
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 app_name = 'posts'
 
@@ -11,4 +11,32 @@ urlpatterns = [
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('create/', views.post_create, name='post_create'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('popular/', views.popular, name='popular'),
+    path('search/', views.search, name='search'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path(
+        'profile/<str:username>/follow/',
+        views.profile_follow,
+        name='profile_follow',
+    ),
+    path(
+        'profile/<str:username>/unfollow/',
+        views.profile_unfollow,
+        name='profile_unfollow',
+    ),
+    path('feeds/<str:feed_format>/', feeds.index_feed, name='feed'),
+    path(
+        'group/<slug:slug>/feeds/<str:feed_format>/',
+        feeds.group_feed,
+        name='group_feed',
+    ),
+    path(
+        'profile/<str:username>/feeds/<str:feed_format>/',
+        feeds.profile_feed,
+        name='profile_feed',
+    ),
+    path('export/posts/', views.export_posts, name='export_posts'),
+    path('api/posts/', api.index, name='api_index'),
+    path('api/group/<slug:slug>/', api.group_posts, name='api_group_list'),
+    path('api/profile/<str:username>/', api.profile, name='api_profile'),
 ]
@@ -1,8 +1,298 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from hashlib import md5
+
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+FORWARD = 'n'
+BACKWARD = 'p'
+ELLIPSIS = '…'
+COUNT_KEY = 'count:{}'
 
 
 def paginator_obj(request, list):
     paginator = Paginator(list, settings.POSTS_IN_PAGE)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
+
+
+def encode_key(direction, pk, value):
+    raw = f'{direction}{pk}:{value}'
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_key(cursor):
+    """Возвращает (направление, pk, значение ключа) или None."""
+    if not cursor:
+        return None
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        direction, raw = raw[0], raw[1:]
+        pk, value = raw.split(':', 1)
+        pk = int(pk)
+    except (Base64Error, UnicodeDecodeError, ValueError, IndexError):
+        return None
+    if direction not in (FORWARD, BACKWARD):
+        return None
+    return direction, pk, value
+
+
+def encode_cursor(direction, post):
+    return encode_key(direction, post.pk, post.pub_date.isoformat())
+
+
+def decode_cursor(cursor):
+    """Возвращает (направление, pub_date, pk) или None для битого курсора."""
+    key = decode_key(cursor)
+    if key is None:
+        return None
+    direction, pk, value = key
+    try:
+        pub_date = parse_datetime(value)
+    except ValueError:
+        return None
+    if pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+def after_key(queryset, pub_date, pk, pk_field='pk'):
+    """Посты ленты (-pub_date, -pk), идущие после ключа (pub_date, pk).
+
+    Лишнее условие pub_date__lte даёт SQLite границу для поиска по индексу.
+    pk_field — поле второго ключа сортировки, если это не pk.
+    """
+    return queryset.filter(
+        Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, **{
+            f'{pk_field}__lt': pk
+        }),
+        pub_date__lte=pub_date,
+    )
+
+
+def before_key(queryset, pub_date, pk, pk_field='pk'):
+    """Посты, идущие в ленте до ключа (pub_date, pk), — новее него."""
+    return queryset.filter(
+        Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, **{
+            f'{pk_field}__gt': pk
+        }),
+        pub_date__gte=pub_date,
+    )
+
+
+class CursorPage(Page):
+    """Страница ленты, листаемая курсорами next_cursor/previous_cursor."""
+
+    def __init__(self, object_list, number, paginator,
+                 next_cursor=None, previous_cursor=None):
+        super().__init__(object_list, number, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage {self.number or self.previous_cursor}>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class CursorPaginator(Paginator):
+    """Keyset-пагинация по (pub_date, id) без COUNT(*) и OFFSET.
+
+    Стоимость страницы не зависит от её глубины: каждый запрос — это
+    поиск по индексу от ключа курсора и LIMIT per_page + 1.
+    """
+
+    ordering = ('-pub_date', '-pk')
+    template = 'posts/includes/cursor_paginator.html'
+
+    def __init__(self, object_list, per_page):
+        super().__init__(object_list.order_by(*self.ordering), per_page)
+
+    def get_cursor_page(self, cursor):
+        position = decode_cursor(cursor)
+        if position is None:
+            return self._build_page(self._forward(None), None, False)
+        direction, pub_date, pk = position
+        if direction == BACKWARD:
+            return self._backward_page(pub_date, pk)
+        return self._build_page(self._forward(pub_date, pk), None, True)
+
+    def get_page(self, number):
+        """Совместимость со ссылками вида ?page=N: одна выборка с OFFSET,
+        дальше листание идёт курсорами."""
+        try:
+            number = max(int(number), 1)
+        except (TypeError, ValueError):
+            number = 1
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return self._build_page(rows, number, number > 1)
+
+    def _forward(self, pub_date, pk=None):
+        queryset = self.object_list
+        if pub_date is not None:
+            queryset = after_key(queryset, pub_date, pk)
+        return list(queryset[:self.per_page + 1])
+
+    def _backward(self, pub_date, pk):
+        """До per_page + 1 постов новее ключа, от старых к новым."""
+        queryset = before_key(self.object_list, pub_date, pk).reverse()
+        return list(queryset[:self.per_page + 1])
+
+    def _backward_page(self, pub_date, pk):
+        rows = self._backward(pub_date, pk)
+        if len(rows) <= self.per_page:
+            # Дошли до начала ленты: отдаём полную первую страницу.
+            return self._build_page(self._forward(None), None, False)
+        rows = rows[:self.per_page][::-1]
+        page = self._build_page(rows, None, True)
+        page.next_cursor = encode_cursor(FORWARD, rows[-1])
+        return page
+
+    def _build_page(self, rows, number, has_previous):
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(FORWARD, rows[-1])
+        if rows and has_previous:
+            previous_cursor = encode_cursor(BACKWARD, rows[0])
+        return CursorPage(rows, number, self, next_cursor, previous_cursor)
+
+
+def cursor_paginator_obj(request, queryset):
+    paginator = CursorPaginator(queryset, settings.POSTS_IN_PAGE)
+    cursor = request.GET.get('cursor')
+    if cursor is None and 'page' in request.GET:
+        return paginator.get_page(request.GET['page'])
+    return paginator.get_cursor_page(cursor)
+
+
+def cached_count(queryset):
+    """COUNT(*) выборки, закэшированный на PAGINATOR_COUNT_TIMEOUT секунд."""
+    key = COUNT_KEY.format(md5(str(queryset.query).encode()).hexdigest())
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.PAGINATOR_COUNT_TIMEOUT)
+    return count
+
+
+class WindowedPage(Page):
+    """Страница WindowedPaginator: следующая есть, если её видели."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    @property
+    def page_range(self):
+        return self.paginator.get_elided_page_range(self.number)
+
+
+class WindowedPaginator(Paginator):
+    """Нумерованная пагинация по приблизительному числу объектов.
+
+    count берётся из переданного числа или функции (например, счётчика
+    постов группы), иначе из cached_count. page_range страницы отдаёт
+    только окно ссылок вокруг неё, пропуски обозначены ELLIPSIS. Начиная
+    с последней по оценке страницы выбирается на строку больше: если она
+    есть, открывается следующая страница, так что заниженный count не
+    прячет посты за последней страницей.
+    """
+
+    template = 'posts/includes/paginator.html'
+    ELLIPSIS = ELLIPSIS
+    on_each_side = 2
+    on_ends = 1
+
+    def __init__(self, object_list, per_page, count=None):
+        super().__init__(object_list, per_page)
+        self._count = count
+
+    @cached_property
+    def count(self):
+        if self._count is None:
+            return cached_count(self.object_list)
+        if callable(self._count):
+            return self._count()
+        return self._count
+
+    def validate_number(self, number):
+        """Как у Paginator, но страницы за оценкой num_pages допустимы."""
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if int(number) < 1:
+                raise
+            return int(number)
+
+    def get_page(self, number):
+        try:
+            return super().get_page(number)
+        except EmptyPage:
+            return self.page(self.num_pages)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if number < self.num_pages:
+            return self._get_page(
+                self.object_list[bottom:top], number, self, True
+            )
+        rows = list(self.object_list[bottom:top + 1])
+        if not rows and number > self.num_pages:
+            raise EmptyPage('Страница пуста')
+        return self._get_page(
+            rows[:self.per_page], number, self, len(rows) > self.per_page
+        )
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+    def get_elided_page_range(self, number=1):
+        """Номера страниц вокруг number, по краям и ELLIPSIS между ними."""
+        num_pages = max(self.num_pages, number)
+        on_each_side, on_ends = self.on_each_side, self.on_ends
+        if num_pages <= (on_each_side + on_ends) * 2:
+            return list(range(1, num_pages + 1))
+        pages = []
+        if number > on_each_side + on_ends + 2:
+            pages += range(1, on_ends + 1)
+            pages.append(ELLIPSIS)
+            pages += range(number - on_each_side, number + 1)
+        else:
+            pages += range(1, number + 1)
+        if number < num_pages - on_each_side - on_ends - 1:
+            pages += range(number + 1, number + on_each_side + 1)
+            pages.append(ELLIPSIS)
+            pages += range(num_pages - on_ends + 1, num_pages + 1)
+        else:
+            pages += range(number + 1, num_pages + 1)
+        return pages
+
+
+def windowed_paginator_obj(request, list, count=None):
+    paginator = WindowedPaginator(list, settings.POSTS_IN_PAGE, count)
+    page_number = request.GET.get('page')
+    return paginator.get_page(page_number)
+
+
+def feed_page(request, queryset, count=None):
+    """Страница ленты в режиме FEED_PAGINATION: 'cursor' или 'pages'."""
+    if settings.FEED_PAGINATION == 'pages':
+        return windowed_paginator_obj(request, queryset, count)
+    return cursor_paginator_obj(request, queryset)
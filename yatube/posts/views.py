@@ -1,24 +1,76 @@
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
-from .forms import PostForm
-from .models import Group, Post, User
-from .utils import paginator_obj
+from core.sqlite import write_with_retry
 
+from .cache import cache_anonymous_page, conditional_page, tag_page
+from .export import (ExportError, content_type, export_queryset,
+                     export_stream, file_name)
+from .forms import PostForm, PostImageForm
+from .models import (AuthorStats, Follow, Group, Post, PostPopularity,
+                     User)
+from .popular import count_views, popular_page
+from .search import search_page
+from .timeline import follow, follow_page, unfollow
+from .utils import feed_page
 
+
+def index_tags(request, **kwargs):
+    return ['feed:index']
+
+
+def group_tags(request, slug, **kwargs):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk', flat=True
+    ).first()
+    return None if group_id is None else [f'group:{group_id}']
+
+
+def profile_tags(request, username, **kwargs):
+    author_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    tags = [f'author:{author_id}']
+    if request.user.is_authenticated:
+        tags.append(f'follow:{request.user.pk}')
+    return tags
+
+
+def post_detail_tags(request, post_id):
+    ids = Post.objects.filter(pk=post_id).values_list(
+        'author_id', 'group_id'
+    ).order_by('pk').first()
+    if ids is None:
+        return None
+    author_id, group_id = ids
+    tags = [f'post:{post_id}', f'author:{author_id}']
+    if group_id is not None:
+        tags.append(f'group:{group_id}')
+    return tags
+
+
+@conditional_page(index_tags)
+@cache_anonymous_page('feed:index')
 def index(request):
     posts_list = Post.objects.all().select_related('author', 'group')
-    page_obj = paginator_obj(request, posts_list)
+    page_obj = feed_page(request, posts_list)
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/index.html', context)
 
 
+@conditional_page(group_tags)
+@cache_anonymous_page()
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
+    tag_page(request, f'group:{group.pk}')
     posts_list = group.posts.all().select_related('author')
-    page_obj = paginator_obj(request, posts_list)
+    page_obj = feed_page(request, posts_list, group.post_count)
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -26,41 +78,88 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@conditional_page(profile_tags)
+@cache_anonymous_page()
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('post_stats'), username=username
+    )
+    tag_page(request, f'author:{author.pk}')
     posts = author.posts.all().select_related('group')
-    count_posts = posts.count()
-    page_obj = paginator_obj(request, posts)
+    count = AuthorStats.post_count_for(author)
+    page_obj = feed_page(request, posts, count)
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author
+    ).exists()
 
     context = {
-        'count': count_posts,
+        'count': count,
         'page_obj': page_obj,
         'author': author,
+        'following': following,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@count_views
+@conditional_page(post_detail_tags)
+@cache_anonymous_page()
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    tag_page(request, f'post:{post_id}')
+    post = get_object_or_404(
+        Post.objects.select_related(
+            'author__post_stats', 'group', 'popularity'
+        ),
+        pk=post_id
+    )
+    tag_page(request, f'author:{post.author_id}')
+    if post.group_id:
+        tag_page(request, f'group:{post.group_id}')
     context = {
         'post': post,
+        'count': AuthorStats.post_count_for(post.author),
+        'views': PostPopularity.views_for(post),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@cache_anonymous_page('feed:popular')
+def popular(request):
+    context = {
+        'page_obj': popular_page(request),
+    }
+    return render(request, 'posts/popular.html', context)
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = search_page(query, request.GET.get('cursor')) if query else None
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(
         request.POST or None,
         files=request.FILES or None
     )
-    if form.is_valid():
+    image_form = PostImageForm(
+        request.POST or None,
+        files=request.FILES or None,
+        instance=form.instance
+    )
+    if all((form.is_valid(), image_form.is_valid())):
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        write_with_retry(post.save, instances=[post])
         return redirect('posts:profile', post.author.username)
     context = {
         'form': form,
+        'image_form': image_form,
     }
     return render(request, 'posts/create_post.html', context)
 
@@ -68,17 +167,69 @@ def post_create(request):
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    if request.user != post.author:
+    if request.user.pk != post.author_id:
         return redirect('posts:post_detail', post_id)
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
         instance=post
     )
-    if form.is_valid():
-        post = form.save()
+    image_form = PostImageForm(
+        request.POST or None,
+        files=request.FILES or None,
+        instance=post
+    )
+    if all((form.is_valid(), image_form.is_valid())):
+        post = write_with_retry(form.save, instances=[post])
         return redirect('posts:post_detail', post_id)
     context = {
         'form': form,
+        'image_form': image_form,
     }
     return render(request, 'posts/create_post.html', context)
+
+
+@login_required
+def follow_index(request):
+    context = {
+        'page_obj': follow_page(request),
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        follow(request.user, author)
+    return redirect('posts:profile', username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    unfollow(request.user, author)
+    return redirect('posts:profile', username)
+
+
+@staff_member_required
+def export_posts(request):
+    file_format = request.GET.get('format', 'csv')
+    gzip = request.GET.get('gzip') == '1'
+    try:
+        queryset = export_queryset(
+            group=request.GET.get('group'),
+            author=request.GET.get('author'),
+            since=request.GET.get('since'),
+            until=request.GET.get('until'),
+        )
+        stream = export_stream(queryset, file_format, gzip)
+    except ExportError as error:
+        return HttpResponseBadRequest(str(error))
+    response = StreamingHttpResponse(
+        stream, content_type=content_type(file_format, gzip)
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{file_name(file_format, gzip)}"'
+    )
+    return response
@@ -1,4 +1,5 @@
 import os
+from datetime import datetime, timezone
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -24,9 +25,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,12 +43,20 @@ MIDDLEWARE = [
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.timing.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Без DEBUG шаблоны читаются и компилируются один раз
+            # на процесс.
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -62,8 +74,63 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 60,
+    },
+    # Копия default только для чтения; путь к ней задаёт YATUBE_REPLICA_DB.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'YATUBE_REPLICA_DB', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+        'CONN_MAX_AGE': 60,
+    },
+}
+
+# Прагмы каждого соединения с SQLite (core.sqlite): WAL даёт читать во
+# время записи, busy_timeout — ждать блокировку вместо ошибки.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+SQLITE_WRITE_RETRIES = 5
+SQLITE_WRITE_RETRY_DELAY = 0.02
+
+# Алиасы реплик для core.routers; пустой список — всё читается с default.
+DATABASE_REPLICAS = ['replica'] if 'YATUBE_REPLICA_DB' in os.environ else []
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+REPLICA_PIN_COOKIE = 'pin_primary'
+REPLICA_PIN_SECONDS = 10
+
+# Сессии и пользователь запроса (core.sessions, core.auth) живут в
+# отдельном кеше shared, общем для процессов сайта и воркера run_tasks:
+# memcached по адресу из YATUBE_MEMCACHED (нужен python-memcached). Без
+# него shared — кеш в памяти процесса, и запуск без DEBUG падает.
+# Остальные кеши сайта остаются в памяти процесса.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ['YATUBE_MEMCACHED'],
+    } if 'YATUBE_MEMCACHED' in os.environ else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shared',
+    },
 }
+TEST_RUNNER = 'core.testing.TestRunner'
+
+# Сессии и пользователь запроса читаются из кеша, см. core.sessions
+# и core.auth; изменения сессий переносятся в БД задачей.
+SESSION_ENGINE = 'core.sessions'
+SESSION_CACHE_ALIAS = 'shared'
+AUTHENTICATION_BACKENDS = ['core.auth.CachedModelBackend']
+USER_CACHE_ALIAS = 'shared'
+USER_CACHE_TIMEOUT = 60 * 5
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -94,11 +161,66 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+FILE_UPLOAD_HANDLERS = (
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+)
+
+# Фоновые задачи core.tasks: при TASKS_SYNC все выполняются сразу, без
+# воркера run_tasks; TASK_MODES переопределяет режим отдельных задач.
+TASKS_SYNC = DEBUG
+TASK_MODES = {}
+TASK_LOCK_TIMEOUT = 60 * 10
+
 POSTS_IN_PAGE = 10
+FEED_PAGINATION = 'cursor'
+PAGINATOR_COUNT_TIMEOUT = 60 * 5
+PAGE_CACHE_TIMEOUT = 0 if DEBUG else 60 * 15
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_CACHE_TIMEOUT = 0 if DEBUG else 60 * 60 * 24
+# Попадания и промахи кеша страниц копятся в памяти процесса и пишутся
+# в кеш пачкой, а не двумя записями на каждый запрос.
+PAGE_CACHE_STATS_FLUSH_SECONDS = 10
+PAGE_CACHE_STATS_FLUSH_SIZE = 100
+FEED_ITEMS = 20
+SERVER_TIMING_HEADER = True
 THIRTEEN = 13
 
+# Лента подписок (posts.timeline): сколько записей хранится на читателя
+# и сколько постов за сутки делают автора «плодовитым» — его посты не
+# раскладываются по лентам, а дочитываются при показе.
+TIMELINE_SIZE = 500
+TIMELINE_PULL_DAILY_POSTS = 50
+
+# Просмотры постов копятся в памяти процесса и пишутся пачкой, см.
+# posts.popular; вес просмотра в рейтинге вдвое падает за POPULAR_HALF_LIFE.
+VIEW_COUNTER_FLUSH_SECONDS = 10
+VIEW_COUNTER_FLUSH_SIZE = 100
+POPULAR_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+POPULAR_HALF_LIFE = 60 * 60 * 24
+POPULAR_POSTS = 100
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yatube.timing': {
+            'handlers': ['console'],
+            'level': 'WARNING' if DEBUG else 'INFO',
+            'propagate': False,
+        },
+    },
+}